@@ -1,10 +1,14 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.issue_registry import IssueSeverity, async_create_issue
+from homeassistant.helpers.typing import ConfigType
 from yarl import URL
 
-from .const import CONF_BASE_URL, DOMAIN
+from .cache import DeviceCache
+from .const import CONF_BASE_URL, CONF_REQUEST_STATISTICS, DOMAIN
+from .services import async_setup_services
 from .shared import Shared
 
 PLATFORMS: list[Platform] = [
@@ -21,19 +25,36 @@ PLATFORMS: list[Platform] = [
     Platform.TEXT,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    shared = Shared(hass, URL(entry.data[CONF_BASE_URL]))
+    shared = Shared(
+        hass,
+        URL(entry.data[CONF_BASE_URL]),
+        entry.entry_id,
+        request_statistics=entry.options.get(CONF_REQUEST_STATISTICS, False),
+    )
     await shared.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = shared
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         shared: Shared | None = hass.data[DOMAIN].pop(entry.entry_id)
@@ -43,6 +64,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await DeviceCache(hass, entry.entry_id).async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     version = (config_entry.version, config_entry.minor_version)
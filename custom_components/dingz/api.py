@@ -1,8 +1,13 @@
 import asyncio
+import collections
+import contextlib
 import dataclasses
+import enum
+import json
 import logging
+import random
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Iterator
 from typing import Any, Literal, TypedDict, cast
 
 import aiohttp
@@ -72,7 +77,7 @@ class SensorPowerOutput(TypedDict, total=False):
 
 
 class StateSensors(TypedDict, total=False):
-    brightness: int
+    brightness: float
     light_state: str
     light_state_lpf: str
     room_temperature: float
@@ -117,7 +122,7 @@ class StateWifi(TypedDict, total=False):
     connected: bool
 
 
-class StateConfig:
+class StateConfig(TypedDict, total=False):
     timestamp: int
 
 
@@ -462,33 +467,665 @@ class FullDeviceConfig:
     ddi_channels: list[DdiChannelConfig]
 
 
-class _ReqThrottleLock(asyncio.Lock):
-    throttle_duration: float
+CommandTarget = Literal["dimmer"] | Literal["ddi"] | Literal["shade"] | Literal["led"]
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class Command:
+    """A single command sent as part of `Client.send_commands`."""
+
+    target: CommandTarget
+    index: int = 0
+    action: str
+    """Action as accepted by the corresponding endpoint. Shades additionally accept "position"."""
+    value: int | None = None
+    """Brightness (0-100) for dimmers and DDI channels, blind position (0-100) for shades."""
+    lamella: int | None = None
+    color: str | None = None
+    """Color of the LED in the "h;s;v" format."""
+    time: int | None = None
+    """Passed as `time` to dimmers, DDI channels and shades (except for "position") and as `ramp` to the LED."""
+
+    def validate(self) -> None:
+        """Raise `ValueError` if the command can't be sent as given."""
+        actions = COMMAND_ACTIONS.get(self.target)
+        if actions is None:
+            raise ValueError(f"unknown command target: {self.target}")
+        if self.action not in actions:
+            raise ValueError(f"unsupported {self.target} action: {self.action}")
+        if (
+            self.target == "shade"
+            and self.action == "position"
+            and self.time is not None
+        ):
+            raise ValueError("time isn't supported when moving a shade to a position")
+
+
+COMMAND_ACTIONS: dict[CommandTarget, frozenset[str]] = {
+    "dimmer": frozenset(("on", "off", "toggle", "dim", "pulse")),
+    "ddi": frozenset(("on", "off", "toggle")),
+    "shade": frozenset(
+        (
+            "stop",
+            "up",
+            "down",
+            "initialize",
+            "upstop",
+            "downstop",
+            "togglestop",
+            "position",
+        )
+    ),
+    "led": frozenset(("on", "off", "toggle")),
+}
+"""Actions accepted for each command target."""
+
+
+class CommandSupersededError(Exception):
+    """A command of `Client.send_commands` was dropped because a later one for the same output replaced it."""
+
+
+# Lights are sent first since any delay is most noticeable with them.
+_COMMAND_TARGET_ORDER: dict[CommandTarget, int] = {
+    "dimmer": 0,
+    "ddi": 1,
+    "led": 2,
+    "shade": 3,
+}
+
+
+class RequestPriority(enum.IntEnum):
+    """Lanes of the request scheduler, lower values are served first."""
+
+    INTERACTIVE = 0
+    STATE = 1
+    BACKGROUND = 2
 
-    def __init__(self, duration: float) -> None:
-        super().__init__()
 
+class _ReqThrottleLock:
+    """Limits the number of concurrent requests and spaces them out.
+
+    Up to `limit` holders can hold the lock at the same time. A slot is only handed out once
+    `throttle_duration` has passed since the last release, and always to the waiter with the highest
+    priority at that point. Waiting for the gap doesn't occupy a slot, so background requests yield to
+    interactive ones between requests. Interactive requests wait at most `max_interactive_duration`.
+    """
+
+    throttle_duration: float
+    max_interactive_duration: float
+
+    def __init__(
+        self,
+        duration: float,
+        *,
+        limit: int = 1,
+        max_interactive_duration: float | None = None,
+    ) -> None:
         self.throttle_duration = duration
+        self.max_interactive_duration = (
+            duration if max_interactive_duration is None else max_interactive_duration
+        )
+        self._limit = limit
+        self._active = 0
+        self._waiters: dict[
+            RequestPriority, collections.deque[asyncio.Future[None]]
+        ] = {priority: collections.deque() for priority in RequestPriority}
         self._last_release_at: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int) -> None:
+        self._limit = max(1, value)
+        self._dispatch()
 
-    async def acquire(self) -> Literal[True]:
-        res = await super().acquire()
-        if self._last_release_at:
-            passed = time.time() - self._last_release_at
-            remaining = self.throttle_duration - passed
-            if remaining > 0:
-                await asyncio.sleep(remaining)
-        return res
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @property
+    def queue_depths(self) -> dict[str, int]:
+        return {
+            priority.name.lower(): len(waiters)
+            for priority, waiters in self._waiters.items()
+        }
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
+
+    @contextlib.asynccontextmanager
+    async def hold(
+        self, priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(
+        self, priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> Literal[True]:
+        if (
+            self._active < self._limit
+            and not self.queue_depth
+            and self._remaining_gap(priority) <= 0
+        ):
+            self._active += 1
+            return True
+
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        waiters.append(fut)
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # we were handed a slot but got cancelled before we could use it
+                self._active -= 1
+                self._dispatch()
+            else:
+                waiters.remove(fut)
+            raise
+        return True
 
     def release(self) -> None:
-        self._last_release_at = time.time()
-        return super().release()
+        self._last_release_at = time.monotonic()
+        self._active -= 1
+        self._dispatch()
+
+    def _remaining_gap(self, priority: RequestPriority) -> float:
+        if self._last_release_at is None:
+            return 0.0
+        duration = self.throttle_duration
+        if priority is RequestPriority.INTERACTIVE:
+            # the gap mostly grows because of background load, commands shouldn't pay for that
+            duration = min(duration, self.max_interactive_duration)
+        return self._last_release_at + duration - time.monotonic()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the waiters with the highest priority whose gap has passed."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for priority, waiters in self._waiters.items():
+            while waiters and self._active < self._limit:
+                if (remaining := self._remaining_gap(priority)) > 0:
+                    # lower priorities don't get to go first, their gap is at least as long
+                    self._timer = asyncio.get_running_loop().call_later(
+                        remaining, self._dispatch
+                    )
+                    return
+                fut = waiters.popleft()
+                if not fut.done():
+                    self._active += 1
+                    fut.set_result(None)
+            if waiters:
+                return
+
+
+# Somewhat arbitrary limits reported by iolo.
+_MIN_FREE_RAM = 30000
+_MIN_LARGEST_FREE_BLOCK = 1500
+
+
+def _has_ram_headroom(ram: Ram) -> bool:
+    """Whether the device has comfortably more RAM than it needs to respond."""
+    return (
+        ram["free"] >= 2 * _MIN_FREE_RAM
+        and ram["largest_free_block"] >= 2 * _MIN_LARGEST_FREE_BLOCK
+    )
+
+
+_RAM_PER_REQUEST = 16000
+"""Conservative estimate of the RAM a dingz needs while it answers a config request."""
+
+
+def _parallel_requests_fitting(ram: Ram) -> int:
+    """Number of requests the device can answer at the same time without running low on RAM."""
+    if ram["largest_free_block"] < 2 * _MIN_LARGEST_FREE_BLOCK:
+        return 1
+    return max(1, (ram["free"] - _MIN_FREE_RAM) // _RAM_PER_REQUEST)
+
+
+class _AdaptiveGap:
+    """Tunes the recovery gap between requests to a device (AIMD).
+
+    The gap shrinks by `step` after every healthy response and is multiplied when the device shows
+    signs of overload: slow responses, 5xx responses, timeouts or little free RAM. It only shrinks below
+    the initial gap while a recent RAM reading (at most `ram_max_age` seconds old) showed headroom.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        *,
+        minimum: float = 0.05,
+        maximum: float = 2.0,
+        step: float = 0.01,
+        slow_response: float = 1.0,
+        ram_max_age: float = 300.0,
+    ) -> None:
+        self.value = initial
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.slow_response = slow_response
+        self.ram_max_age = ram_max_age
+        self.ram_observed_at: float | None = None
+        self._headroom_until = 0.0
+
+    @property
+    def floor(self) -> float:
+        if time.monotonic() < self._headroom_until:
+            return self.minimum
+        return max(self.minimum, self.initial)
+
+    def observe_response(self, latency: float) -> None:
+        if latency > self.slow_response:
+            self._back_off(1.5)
+        elif self.value > (floor := self.floor):
+            self.value = max(floor, self.value - self.step)
+
+    def observe_overload(self) -> None:
+        self._back_off(2.0)
+
+    def observe_ram(self, ram: Ram) -> None:
+        self.ram_observed_at = time.monotonic()
+        if _has_ram_headroom(ram):
+            self._headroom_until = self.ram_observed_at + self.ram_max_age
+        else:
+            # back off well before the device actually runs out of RAM
+            self._headroom_until = 0.0
+            self._back_off(2.0)
+
+    @property
+    def ram_stale(self) -> bool:
+        return (
+            self.ram_observed_at is None
+            or time.monotonic() - self.ram_observed_at >= self.ram_max_age
+        )
+
+    def _back_off(self, factor: float) -> None:
+        self.value = min(self.maximum, max(self.minimum, self.value * factor))
+
+
+_CONNECTION_STATS_KEY = "dingz_connection_stats"
+
+
+@dataclasses.dataclass(slots=True)
+class ConnectionStats:
+    """Counts how often requests to a device could reuse an open connection."""
+
+    created: int = 0
+    reused: int = 0
+    closed_by_device: int = 0
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        total = self.created + self.reused
+        if not total:
+            return None
+        return self.reused / total
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "closed_by_device": self.closed_by_device,
+            "reuse_ratio": self.reuse_ratio,
+        }
+
+
+def _connection_stats(trace_config_ctx: Any) -> ConnectionStats | None:
+    trace_request_ctx = trace_config_ctx.trace_request_ctx
+    if trace_request_ctx is None:
+        return None
+    return trace_request_ctx.get(_CONNECTION_STATS_KEY)
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession, trace_config_ctx: Any, params: Any
+) -> None:
+    if stats := _connection_stats(trace_config_ctx):
+        stats.created += 1
+
+
+async def _on_connection_reuseconn(
+    session: aiohttp.ClientSession, trace_config_ctx: Any, params: Any
+) -> None:
+    if stats := _connection_stats(trace_config_ctx):
+        stats.reused += 1
+
+
+_DEFAULT_MAX_CONCURRENCY = 2
+"""Maximum number of requests a dingz is asked to handle at the same time.
+
+The http server of the dingz copes with a couple of parallel requests as long as it has enough RAM.
+Requests start out serial and only run in parallel while the last RAM reading of the device leaves
+room for them. Commands are always sent one after the other so they're applied in order.
+"""
+
+
+def create_session(
+    *,
+    keepalive_timeout: float = 60.0,
+    limit_per_host: int = _DEFAULT_MAX_CONCURRENCY,
+) -> aiohttp.ClientSession:
+    """Create a session tuned for talking to dingz devices.
+
+    The devices have a tiny TCP stack, so no more connections are opened to a device than it's asked to
+    handle requests in parallel, and they're kept open to be reused. Connection reuse is recorded in
+    the `ConnectionStats` of each client.
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    connector = aiohttp.TCPConnector(
+        limit_per_host=limit_per_host, keepalive_timeout=keepalive_timeout
+    )
+    return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+
+_WINDOW_SIZE = 100
+"""Number of recent requests the timing percentiles are computed from."""
+
+
+class RollingWindow:
+    """Keeps the most recent samples of a metric."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, size: int = _WINDOW_SIZE) -> None:
+        self._samples: collections.deque[float] = collections.deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def as_dict(self) -> dict[str, Any] | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        count = len(ordered)
+        return {
+            "count": count,
+            "mean": sum(ordered) / count,
+            "p50": ordered[count // 2],
+            "p95": ordered[min(count - 1, int(count * 0.95))],
+            "max": ordered[-1],
+        }
+
+
+@dataclasses.dataclass(slots=True)
+class RequestTrace:
+    """Timings of a single request, summed up over all of its attempts."""
+
+    attempts: int = 0
+    lock_wait: float = 0.0
+    """Time spent waiting for the device lock."""
+    limiter_wait: float = 0.0
+    """Time spent waiting for the request limiter shared by all devices."""
+    ttfb: float | None = None
+    decode: float | None = None
+    body_size: int | None = None
+    status: int | None = None
+    _sent_at: float = 0.0
+
+    def sent(self) -> None:
+        self._sent_at = time.monotonic()
+
+    def received_headers(self, status: int) -> None:
+        self.ttfb = time.monotonic() - self._sent_at
+        self.status = status
+
+
+class RequestStats:
+    """Counters and rolling timings of the requests to an endpoint."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: collections.Counter[int] = collections.Counter()
+        self.total = RollingWindow()
+        self.lock_wait = RollingWindow()
+        self.limiter_wait = RollingWindow()
+        self.ttfb = RollingWindow()
+        self.decode = RollingWindow()
+        self.body_size = RollingWindow()
+
+    def add(self, trace: RequestTrace, duration: float, *, failed: bool) -> None:
+        self.requests += 1
+        self.retries += max(0, trace.attempts - 1)
+        if failed:
+            self.errors += 1
+        if trace.status is not None:
+            self.statuses[trace.status] += 1
+        self.total.add(duration)
+        self.lock_wait.add(trace.lock_wait)
+        self.limiter_wait.add(trace.limiter_wait)
+        if trace.ttfb is not None:
+            self.ttfb.add(trace.ttfb)
+        if trace.decode is not None:
+            self.decode.add(trace.decode)
+        if trace.body_size is not None:
+            self.body_size.add(trace.body_size)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "total": self.total.as_dict(),
+            "lock_wait": self.lock_wait.as_dict(),
+            "limiter_wait": self.limiter_wait.as_dict(),
+            "ttfb": self.ttfb.as_dict(),
+            "decode": self.decode.as_dict(),
+            "body_size": self.body_size.as_dict(),
+        }
+
+
+def _endpoint_key(path: str) -> str:
+    # "dimmer/0/on" and "dimmer/1/on" are the same endpoint
+    return "/".join("{n}" if part.isdigit() else part for part in path.split("/"))
+
+
+class RequestInstrumentation:
+    """Aggregates request traces per endpoint and for the whole device."""
+
+    def __init__(self) -> None:
+        self.total = RequestStats()
+        self.endpoints: dict[str, RequestStats] = {}
+
+    def record(
+        self, path: str, trace: RequestTrace, duration: float, *, failed: bool
+    ) -> None:
+        key = _endpoint_key(path)
+        if (stats := self.endpoints.get(key)) is None:
+            stats = self.endpoints[key] = RequestStats()
+        stats.add(trace, duration, failed=failed)
+        self.total.add(trace, duration, failed=failed)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total.as_dict(),
+            "endpoints": {
+                key: stats.as_dict() for key, stats in sorted(self.endpoints.items())
+            },
+        }
+
+
+class RequestLimiter:
+    """Caps the number of in-flight requests across multiple clients.
+
+    Free slots are handed to waiting state refreshes before background requests. Interactive requests
+    (commands) bypass the limit entirely, otherwise a command could wait behind the polls of other
+    devices even though its own device is idle.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max_in_flight
+        self._active = 0
+        self._waiters: dict[
+            RequestPriority, collections.deque[asyncio.Future[None]]
+        ] = {priority: collections.deque() for priority in RequestPriority}
+        self._in_flight = 0
+        self._requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def _waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[None]:
+        limited = priority is not RequestPriority.INTERACTIVE
+        start = time.monotonic()
+        if limited:
+            await self._acquire(priority)
+
+        waited = time.monotonic() - start
+        self._requests += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if limited:
+                self._release()
+
+    async def _acquire(self, priority: RequestPriority) -> None:
+        if self._active < self.max_in_flight and not self._waiting:
+            self._active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # we were handed a slot but got cancelled before we could use it
+                self._release()
+            else:
+                waiters.remove(fut)
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        for waiters in self._waiters.values():
+            while waiters and self._active < self.max_in_flight:
+                fut = waiters.popleft()
+                if not fut.done():
+                    self._active += 1
+                    fut.set_result(None)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "requests": self._requests,
+            "average_wait": self._total_wait / self._requests
+            if self._requests
+            else 0.0,
+            "max_wait": self._max_wait,
+        }
 
 
 class NotEnoughRamError(Exception):
     """Raised when the device does not have enough free RAM to return a response."""
 
 
+class DeviceUnavailableError(Exception):
+    """Raised without contacting the device while it's considered unreachable."""
+
+
+@dataclasses.dataclass(slots=True, kw_only=True, frozen=True)
+class RetryPolicy:
+    """How failed requests are retried.
+
+    The delay between attempts grows exponentially (with full jitter). No further attempt is made if
+    it would start after the time budget of the request is used up.
+    """
+
+    attempts: int
+    base_delay: float
+    max_delay: float
+    budget: float
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+DEFAULT_GET_RETRY_POLICY = RetryPolicy(
+    attempts=5, base_delay=0.5, max_delay=4.0, budget=8.0
+)
+DEFAULT_POST_RETRY_POLICY = RetryPolicy(
+    attempts=3, base_delay=1.0, max_delay=4.0, budget=8.0
+)
+
+
+class _CircuitBreaker:
+    """Tracks whether a device is reachable.
+
+    After `failure_threshold` consecutive requests failed to connect, the circuit opens and requests
+    fail immediately. Once `reset_timeout` passed, a single probe request decides whether to close it again.
+    """
+
+    def __init__(self, *, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probing = False
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def probe_due(self) -> bool:
+        if self._opened_at is None or self.probing:
+            return False
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+_ABSOLUTE_ACTIONS = frozenset(("on", "off", "dim", "up", "down", "stop"))
+"""Actions whose outcome doesn't depend on the previous state, so a newer one can replace an older one."""
+
+
 class Client:
     @property
     def base_url(self) -> URL:
@@ -498,35 +1135,265 @@ class Client:
         self,
         session: aiohttp.ClientSession,
         base_url: URL | str,
+        *,
+        max_concurrency: int | None = None,
+        limiter: RequestLimiter | None = None,
+        get_retry_policy: RetryPolicy = DEFAULT_GET_RETRY_POLICY,
+        post_retry_policy: RetryPolicy = DEFAULT_POST_RETRY_POLICY,
+        json_loads: Callable[[str], Any] = json.loads,
+        instrument: bool = False,
     ) -> None:
         self._session = session
+        self._json_loads = json_loads
         self._base_url = URL(base_url)
+        self._limiter = limiter
+        self.get_retry_policy = get_retry_policy
+        self.post_retry_policy = post_retry_policy
+        self._breaker = _CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+        # start with 200ms for the dingz to recover after every request
+        self._gap = _AdaptiveGap(0.2)
         self._lock = _ReqThrottleLock(
-            0.2
-        )  # 200ms for the dingz to recover after every request
+            self._gap.value, max_interactive_duration=self._gap.initial
+        )
+        self._max_concurrency = max_concurrency
+        # requests stay serial until a RAM reading shows the device has room for more
+        self._ram_allowance = 1
+        self._command_lock = asyncio.Lock()
+        self._command_generations: dict[str, int] = {}
+        self.connection_stats = ConnectionStats()
+        self._trace_request_ctx = {_CONNECTION_STATS_KEY: self.connection_stats}
+        self._closes_connections = False
+        self.instrumentation: RequestInstrumentation | None = (
+            RequestInstrumentation() if instrument else None
+        )
+        self._configure_concurrency()
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._lock.limit
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for the device."""
+        return self._lock.queue_depth
+
+    @property
+    def queue_depths(self) -> dict[str, int]:
+        """Number of requests waiting in each priority lane."""
+        return self._lock.queue_depths
+
+    @property
+    def throttle_gap(self) -> float:
+        """Current recovery gap between requests in seconds."""
+        return self._lock.throttle_duration
+
+    def _update_gap(self) -> None:
+        self._lock.throttle_duration = self._gap.value
+
+    @contextlib.asynccontextmanager
+    async def _slot(
+        self,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        trace: RequestTrace | None = None,
+    ) -> AsyncIterator[None]:
+        wait_start = time.monotonic()
+        async with (
+            self._limiter.slot(priority)
+            if self._limiter is not None
+            else contextlib.nullcontext()
+        ):
+            start = time.monotonic()
+            if trace is not None:
+                trace.limiter_wait += start - wait_start
+                trace.sent()
+            yield
+            self._gap.observe_response(time.monotonic() - start)
+            self._update_gap()
+
+    @property
+    def _wanted_concurrency(self) -> int:
+        if self._max_concurrency is not None:
+            return self._max_concurrency
+        return _DEFAULT_MAX_CONCURRENCY
+
+    def _configure_concurrency(self) -> None:
+        limit = min(self._wanted_concurrency, self._ram_allowance)
+        # more concurrent requests than connections would just queue up in the connector
+        connector = self._session.connector
+        if connector is not None and connector.limit_per_host:
+            limit = min(limit, connector.limit_per_host)
+        if limit != self._lock.limit:
+            _LOGGER.debug(
+                "allowing %d concurrent requests to %s", limit, self._base_url
+            )
+            self._lock.limit = limit
+
+    def _enter_ram_pressure(self) -> None:
+        """Fall back to serial requests until the device reports enough free RAM again."""
+        if self._lock.limit > 1:
+            _LOGGER.warning("falling back to serial requests for %s", self._base_url)
+        self._ram_allowance = 1
+        self._configure_concurrency()
+
+    async def _check_circuit(self) -> None:
+        breaker = self._breaker
+        if not breaker.is_open:
+            return
+        if not breaker.probe_due:
+            raise DeviceUnavailableError(f"{self._base_url} is unreachable")
+
+        breaker.probing = True
+        try:
+            _LOGGER.debug("probing %s", self._base_url)
+            await self._with_retries(
+                lambda: self._fetch(self._base_url / "api/v1/ram"),
+                RetryPolicy(attempts=1, base_delay=0, max_delay=0, budget=0),
+                check_circuit=False,
+            )
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            raise DeviceUnavailableError(f"{self._base_url} is unreachable") from exc
+        finally:
+            breaker.probing = False
+
+    async def _with_retries(
+        self,
+        once_fn: Callable[[], Awaitable[Any]],
+        policy: RetryPolicy,
+        *,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        check_circuit: bool = True,
+        trace: RequestTrace | None = None,
+        superseded: Callable[[], bool] | None = None,
+    ) -> Any:
+        """Call `once_fn` under the device lock until it succeeds or the retry policy is exhausted.
+
+        `superseded` is checked before every attempt. Once it returns `True` no further attempt is made
+        and `False` is returned, so a dropped request doesn't wait for the device at all.
+        """
+        if check_circuit:
+            await self._check_circuit()
+
+        deadline = time.monotonic() + policy.budget
+        retry = 0
+        while True:
+            if superseded is not None and superseded():
+                return False
+            # the lock is only held for a single attempt so other requests can go ahead while we back off
+            try:
+                wait_start = time.monotonic()
+                async with self._lock.hold(priority):
+                    if trace is not None:
+                        trace.attempts += 1
+                        trace.lock_wait += time.monotonic() - wait_start
+                    result = await once_fn()
+            except aiohttp.ClientResponseError as exc:
+                # the device is reachable, it just didn't like the request
+                self._breaker.record_success()
+                if exc.status < 500:
+                    raise
+                # a 5xx usually means the device ran out of RAM, parallel requests make that worse
+                self._enter_ram_pressure()
+                self._gap.observe_overload()
+                self._update_gap()
+                last_exc: Exception = exc
+            except (aiohttp.ClientError, TimeoutError) as exc:
+                if isinstance(exc, TimeoutError):
+                    self._gap.observe_overload()
+                    self._update_gap()
+                last_exc = exc
+            else:
+                self._breaker.record_success()
+                return result
+
+            _LOGGER.debug("client error: %s", last_exc)
+            delay = policy.delay(retry)
+            retry += 1
+            if retry >= policy.attempts or time.monotonic() + delay > deadline:
+                break
+            await asyncio.sleep(delay)
+
+        if not isinstance(last_exc, aiohttp.ClientResponseError):
+            self._breaker.record_failure()
+        raise last_exc
+
+    def _observe_connection(self, resp: aiohttp.ClientResponse) -> None:
+        closes = (
+            resp.version is not None and resp.version < aiohttp.HttpVersion11
+        ) or resp.headers.get("Connection", "").lower() == "close"
+        if not closes:
+            return
+        self.connection_stats.closed_by_device += 1
+        if not self._closes_connections:
+            _LOGGER.info(
+                "%s closes the connection after every response, it can't be reused",
+                self._base_url,
+            )
+            self._closes_connections = True
+
+    @contextlib.contextmanager
+    def _traced(self, path: str) -> Iterator[RequestTrace | None]:
+        """Record the timings of the request in the body, if instrumentation is enabled."""
+        if (instrumentation := self.instrumentation) is None:
+            yield None
+            return
+
+        trace = RequestTrace()
+        start = time.monotonic()
+        try:
+            yield trace
+        except BaseException:
+            instrumentation.record(path, trace, time.monotonic() - start, failed=True)
+            raise
+        instrumentation.record(path, trace, time.monotonic() - start, failed=False)
+
+    async def _fetch(
+        self,
+        url: URL,
+        *,
+        allow_404: bool = False,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        trace: RequestTrace | None = None,
+    ) -> Any:
+        _LOGGER.debug("fetching from %s", url)
+        async with (
+            self._slot(priority, trace),
+            self._session.get(url, trace_request_ctx=self._trace_request_ctx) as resp,
+        ):
+            self._observe_connection(resp)
+            if trace is not None:
+                trace.received_headers(resp.status)
+            if allow_404 and resp.status == 404:
+                return None
+            resp.raise_for_status()
+            if trace is None:
+                return await resp.json(loads=self._json_loads)
+
+            trace.body_size = len(await resp.read())
+            start = time.monotonic()
+            data = await resp.json(loads=self._json_loads)
+            trace.decode = time.monotonic() - start
+            return data
 
     async def _get(
         self,
         path: str,
         *,
-        attempts: int = 5,
-        retry_delay: float = 1.0,
         allow_404: bool = False,
         check_out_of_ram: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
     ) -> Any:
         url = self._base_url / "api/v1" / path
 
-        async def once() -> Any:
-            _LOGGER.debug("fetching from %s", url)
-            async with self._session.get(url) as resp:
-                if allow_404 and resp.status == 404:
-                    return None
-                resp.raise_for_status()
-                return await resp.json()
-
         try:
-            async with self._lock:
-                return await _repeat(once, attempts=attempts, retry_delay=retry_delay)
+            with self._traced(path) as trace:
+                return await self._with_retries(
+                    lambda: self._fetch(
+                        url, allow_404=allow_404, priority=priority, trace=trace
+                    ),
+                    self.get_retry_policy,
+                    priority=priority,
+                    trace=trace,
+                )
         except aiohttp.ClientResponseError as exc:
             # Getting back a 5xx code usually means the device doesn't have enough ram.
             if check_out_of_ram and exc.code >= 500 and exc.code < 600:
@@ -540,9 +1407,13 @@ class Client:
         data: dict[str, Any] | str,
         *,
         as_query_params: bool = False,
-        attempts: int = 3,
-        retry_delay: float = 3.0,
-    ) -> None:
+        coalesce_key: str | None = None,
+    ) -> bool:
+        """Post to the device.
+
+        Commands with the same `coalesce_key` supersede each other: if a newer command with the same key
+        is issued while this one is still waiting for the device, this one is dropped and `False` is returned.
+        """
         url = self._base_url / "api/v1" / path
         kwargs = {}
         if isinstance(data, str):
@@ -552,13 +1423,53 @@ class Client:
         else:
             kwargs["json"] = data
 
-        async def once() -> None:
+        generation = 0
+        if coalesce_key is not None:
+            generation = self._command_generations.get(coalesce_key, 0) + 1
+            self._command_generations[coalesce_key] = generation
+
+        def superseded() -> bool:
+            if (
+                coalesce_key is None
+                or self._command_generations[coalesce_key] == generation
+            ):
+                return False
+            _LOGGER.debug("dropping superseded post to %s", url)
+            return True
+
+        async def once() -> bool:
+            # a newer command may have been issued while this one waited for the recovery gap
+            if superseded():
+                return False
             _LOGGER.debug("post to %s with payload %s", url, data)
-            async with self._session.post(url, **kwargs) as resp:  # type: ignore
+            async with (
+                self._slot(RequestPriority.INTERACTIVE, trace),
+                self._session.post(
+                    url,
+                    trace_request_ctx=self._trace_request_ctx,
+                    **kwargs,  # type: ignore
+                ) as resp,
+            ):
+                self._observe_connection(resp)
+                if trace is not None:
+                    trace.received_headers(resp.status)
                 resp.raise_for_status()
-
-        async with self._lock:
-            return await _repeat(once, attempts=attempts, retry_delay=retry_delay)
+            return True
+
+        # commands are sent one at a time so they're applied in the order they were issued
+        with self._traced(path) as trace:
+            if superseded():
+                return False
+            async with self._command_lock:
+                if superseded():
+                    return False
+                return await self._with_retries(
+                    once,
+                    self.post_retry_policy,
+                    priority=RequestPriority.INTERACTIVE,
+                    trace=trace,
+                    superseded=superseded,
+                )
 
     async def _post_services_config(self, config: ServicesConfig) -> None:
         await self._post("services_config", cast(dict[str, Any], config))
@@ -567,22 +1478,55 @@ class Client:
         await self._post("system_config", cast(dict[str, Any], config))
 
     async def get_ram(self) -> Ram:
-        return await self._get("ram", check_out_of_ram=False)
+        ram: Ram = await self._get("ram", check_out_of_ram=False)
+        self._observe_ram(ram)
+        return ram
+
+    def _observe_ram(self, ram: Ram) -> None:
+        self._gap.observe_ram(ram)
+        self._update_gap()
+        self._ram_allowance = _parallel_requests_fitting(ram)
+        self._configure_concurrency()
 
     async def _assert_enough_ram(self) -> None:
         ram = await self.get_ram()
         free = ram["free"]
         largest_free_block = ram["largest_free_block"]
 
-        # Somewhat arbitrary limits reported by iolo.
-        out_of_ram = free < 30000 or largest_free_block < 1500
+        out_of_ram = (
+            free < _MIN_FREE_RAM or largest_free_block < _MIN_LARGEST_FREE_BLOCK
+        )
         if out_of_ram:
+            self._enter_ram_pressure()
             raise NotEnoughRamError(
                 f"Not enough RAM: {free} free, {largest_free_block} largest free block"
             )
 
     async def get_state(self) -> State:
-        return await self._get("state")
+        state: State = await self._get("state", priority=RequestPriority.STATE)
+        if self._gap.ram_stale:
+            # piggyback on the state polling to keep the throttle informed about the RAM of the device,
+            # only once the state request went through so an unreachable device isn't asked twice
+            await self._sample_ram()
+        return state
+
+    async def _sample_ram(self) -> None:
+        """Read the RAM of the device in a single attempt.
+
+        A failure is only logged and doesn't count towards the circuit breaker, the regular requests
+        take care of that.
+        """
+        if self._breaker.is_open:
+            return
+        try:
+            async with self._lock.hold(RequestPriority.STATE):
+                ram: Ram = await self._fetch(
+                    self._base_url / "api/v1/ram", priority=RequestPriority.STATE
+                )
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            _LOGGER.debug("failed to sample RAM of %s: %s", self._base_url, exc)
+            return
+        self._observe_ram(ram)
 
     async def get_device(self) -> DeviceResponseT:
         return await self._get("device")
@@ -616,30 +1560,55 @@ class Client:
             # Either data is None, or it doesn't have the expected structure
             return []
 
-    async def get_full_device_config(self) -> FullDeviceConfig:
+    async def get_full_device_config(
+        self, *, known: FullDeviceConfig | None = None
+    ) -> FullDeviceConfig:
+        """Fetch the full device config.
+
+        If `known` is given and the device still reports the same config hash, it is returned
+        (with the updated device info) instead of fetching the remaining config.
+        """
         devices = await self.get_device()
         device = next(iter(devices.values()), Device())
-        system = await self.get_system_config()
-        services = await self.get_services_config()
-        buttons = await self.get_buttons_config()
-        ddi_channels = await self.get_ddi_channels_config()
-
-        input_config = await self.get_input_config()
-        inputs = input_config.get("inputs", [])
 
-        output_config = await self.get_output_config()
-        outputs = output_config.get("outputs", [])
-
-        blind_config = await self.get_blinds_config()
-        blinds = blind_config.get("blinds", [])
+        if (
+            known is not None
+            and (device_hash := device.get("hash"))
+            and device_hash == known.device.get("hash")
+        ):
+            _LOGGER.debug("device hash unchanged, reusing known config")
+            return dataclasses.replace(known, device=device)
+
+        if self._wanted_concurrency > 1 and self._gap.ram_stale:
+            # only fetch in parallel once the device has shown it has the RAM for it
+            await self._sample_ram()
+
+        # the remaining requests are independent, the throttle lock decides how many actually run in parallel
+        (
+            system,
+            services,
+            buttons,
+            ddi_channels,
+            input_config,
+            output_config,
+            blind_config,
+        ) = await _gather(
+            self.get_system_config(),
+            self.get_services_config(),
+            self.get_buttons_config(),
+            self.get_ddi_channels_config(),
+            self.get_input_config(),
+            self.get_output_config(),
+            self.get_blinds_config(),
+        )
 
         return FullDeviceConfig(
             device=device,
             system=system,
             services=services,
-            inputs=inputs,
-            outputs=outputs,
-            blinds=blinds,
+            inputs=input_config.get("inputs", []),
+            outputs=output_config.get("outputs", []),
+            blinds=blind_config.get("blinds", []),
             buttons=buttons,
             ddi_channels=ddi_channels,
         )
@@ -653,10 +1622,11 @@ class Client:
     async def set_temp_offset(self, offset: float) -> None:
         await self._post_system_config(SystemConfig(temp_offset=offset))
 
-    async def set_led(self, state: SetLedState) -> None:
+    async def set_led(self, state: SetLedState) -> bool:
         # we roll our own encoding here because dingz doesn't support proper form-encoding. semicolons are usually escaped, but dingz can't deal with that at all
         encoded = "&".join(f"{key}={value}" for key, value in state.items())
-        await self._post("led/set", encoded)
+        coalesce_key = "led" if state.get("action") != "toggle" else None
+        return await self._post("led/set", encoded, coalesce_key=coalesce_key)
 
     async def set_dimmer(
         self,
@@ -671,7 +1641,7 @@ class Client:
         ramp: int | None = None,
         time: float | None = None,
         reset_manual_time: bool | None = None,
-    ) -> None:
+    ) -> bool:
         params = {
             key: value
             for key, value in (
@@ -682,7 +1652,12 @@ class Client:
             )
             if value is not None
         }
-        await self._post(f"dimmer/{index}/{action}", params, as_query_params=True)
+        return await self._post(
+            f"dimmer/{index}/{action}",
+            params,
+            as_query_params=True,
+            coalesce_key=f"dimmer/{index}" if action in _ABSOLUTE_ACTIONS else None,
+        )
 
     async def set_ddi_channel(
         self,
@@ -693,7 +1668,7 @@ class Client:
         time: float | None = None,
         reset_manual_time: bool | None = None,
         color_temperature: int | None = None,
-    ) -> None:
+    ) -> bool:
         params = {
             key: value
             for key, value in (
@@ -704,10 +1679,11 @@ class Client:
             )
             if value is not None
         }
-        await self._post(
+        return await self._post(
             f"ddi/channels/{channel}/brightness/{action}",
             params,
             as_query_params=True,
+            coalesce_key=f"ddi/{channel}" if action in _ABSOLUTE_ACTIONS else None,
         )
 
     async def move_blind(
@@ -722,9 +1698,14 @@ class Client:
         | Literal["togglestop"],
         *,
         time: int | None = None,
-    ) -> None:
+    ) -> bool:
         params = {key: value for key, value in (("time", time),) if value is not None}
-        await self._post(f"shade/{index}/{action}", params, as_query_params=True)
+        return await self._post(
+            f"shade/{index}/{action}",
+            params,
+            as_query_params=True,
+            coalesce_key=f"shade/{index}" if action in _ABSOLUTE_ACTIONS else None,
+        )
 
     async def move_blind_position(
         self,
@@ -732,13 +1713,83 @@ class Client:
         *,
         blind: int | None = None,
         lamella: int | None = None,
-    ) -> None:
+    ) -> bool:
         params = {
             key: value
             for key, value in (("blind", blind), ("lamella", lamella))
             if value is not None
         }
-        await self._post(f"shade/{index}", params, as_query_params=True)
+        if lamella is None:
+            coalesce_key = f"shade/{index}"
+        elif blind is None:
+            coalesce_key = f"shade/{index}/lamella"
+        else:
+            coalesce_key = None
+        return await self._post(
+            f"shade/{index}", params, as_query_params=True, coalesce_key=coalesce_key
+        )
+
+    async def send_commands(self, commands: list[Command]) -> list[Exception | None]:
+        """Send multiple commands at once.
+
+        The commands are queued on the device in one go, lights first. Superseded commands for the
+        same output are dropped and reported as `CommandSupersededError`. Returns the error (or `None`)
+        for each command in the given order.
+        """
+        order = sorted(
+            range(len(commands)),
+            key=lambda i: _COMMAND_TARGET_ORDER.get(commands[i].target, 0),
+        )
+        # the tasks queue up on the throttle lock in the order they're created
+        tasks = {
+            i: asyncio.ensure_future(self._send_command(commands[i])) for i in order
+        }
+        results = await asyncio.gather(
+            *(tasks[i] for i in range(len(commands))), return_exceptions=True
+        )
+        return [res if isinstance(res, Exception) else None for res in results]
+
+    async def _send_command(self, command: Command) -> None:
+        command.validate()
+        if not await self._dispatch_command(command):
+            raise CommandSupersededError(
+                "superseded by a later command for the same output"
+            )
+
+    async def _dispatch_command(self, command: Command) -> bool:
+        match command.target:
+            case "dimmer":
+                return await self.set_dimmer(
+                    command.index,
+                    cast(Any, command.action),
+                    value=command.value,
+                    time=command.time,
+                )
+            case "ddi":
+                return await self.set_ddi_channel(
+                    command.index,
+                    cast(Any, command.action),
+                    brightness=command.value,
+                    time=command.time,
+                )
+            case "shade" if command.action == "position":
+                return await self.move_blind_position(
+                    command.index, blind=command.value, lamella=command.lamella
+                )
+            case "shade":
+                return await self.move_blind(
+                    command.index, cast(Any, command.action), time=command.time
+                )
+            case "led":
+                state = SetLedState(action=cast(Any, command.action))
+                if command.color is not None:
+                    state["color"] = command.color
+                    state["mode"] = "hsv"
+                if command.time is not None:
+                    state["ramp"] = command.time
+                return await self.set_led(state)
+            case _:
+                raise ValueError(f"unknown command target: {command.target}")
 
     async def reset_pir_time(self, index: int) -> None:
         await self._post(f"pir/{index}/reset_time", {})
@@ -750,16 +1801,12 @@ class Client:
         await self._post("reboot", {})
 
 
-async def _repeat(
-    once_fn: Callable[[], Awaitable[Any]], *, attempts: int, retry_delay: float
-) -> Any:
-    last_exc = ValueError("no attempts made")
-    for _ in range(attempts):
-        try:
-            return await once_fn()
-        except aiohttp.ClientError as exc:
-            _LOGGER.debug(f"client error: {exc}")
-            last_exc = exc
-        await asyncio.sleep(retry_delay)
-
-    raise last_exc
+async def _gather(*coros: Coroutine[Any, Any, Any]) -> list[Any]:
+    """Like `asyncio.gather`, but cancels the remaining tasks as soon as one fails."""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
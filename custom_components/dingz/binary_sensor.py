@@ -1,5 +1,3 @@
-import contextlib
-
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
@@ -14,12 +12,14 @@ from .const import DOMAIN
 from .helpers import (
     CoordinatedNotificationStateEntity,
     InternalNotificationMixin,
+    JsonPath,
     UserAssignedNameMixin,
+    memoized_property,
 )
 from .shared import (
     InputStateNotification,
-    InternalNotification,
     MqttOnlineNotification,
+    NotificationRoute,
     PirNotification,
     Shared,
 )
@@ -50,7 +50,7 @@ async def async_setup_entry(
 
 
 class Input(
-    CoordinatedNotificationStateEntity,
+    CoordinatedNotificationStateEntity[InputStateNotification],
     BinarySensorEntity,
     UserAssignedNameMixin,
 ):
@@ -78,7 +78,7 @@ class Input(
     def user_given_name(self) -> str | None:
         return self.dingz_input_config.get("name")
 
-    @property
+    @memoized_property
     def device_class(self) -> BinarySensorDeviceClass | None:
         try:
             input_ty = self.dingz_input_config["input"]["type"]
@@ -93,48 +93,41 @@ class Input(
         else:
             return BinarySensorDeviceClass.POWER
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, InputStateNotification)
-            and notification.index == self.__index
-        ):
-            return
-        self._attr_is_on = notification.on
-        self.async_write_ha_state()
+    @property
+    def notification_route(self) -> NotificationRoute[InputStateNotification]:
+        return (InputStateNotification, self.__index)
 
-    @callback
-    def handle_state_update(self) -> None:
-        with contextlib.suppress(LookupError):
-            self._attr_is_on = self.coordinator.data["sensors"]["input_state"]
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("sensors", "input_state")]
+
+    @property
+    def is_on(self) -> bool | None:
+        try:
+            return self.coordinator.data["sensors"]["input_state"]
+        except LookupError:
+            return None
 
 
-class Motion(CoordinatedNotificationStateEntity, BinarySensorEntity):
+class Motion(CoordinatedNotificationStateEntity[PirNotification], BinarySensorEntity):
     _attr_has_entity_name = True
     _attr_device_class = BinarySensorDeviceClass.MOTION
 
     def __init__(self, shared: Shared, *, index: int) -> None:
         super().__init__(shared)
         self.__index = index
-        self.__motion: bool | None = None
 
         self._attr_unique_id = f"{self.coordinator.shared.mac_addr}-motion-{index}"
         self._attr_device_info = self.coordinator.shared.device_info
         self._attr_translation_key = f"motion_{index}"
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, PirNotification)
-            and notification.index == self.__index
-        ):
-            return
-        self.__motion = notification.event_type != "n"
-        self.async_write_ha_state()
+    @property
+    def notification_route(self) -> NotificationRoute[PirNotification]:
+        return (PirNotification, self.__index)
 
-    @callback
-    def handle_state_update(self) -> None:
-        self.__motion = self.dingz_pir.get("motion")
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("sensors", "pirs", self.__index)]
 
     @property
     def dingz_pir(self) -> api.SensorPir:
@@ -148,10 +141,10 @@ class Motion(CoordinatedNotificationStateEntity, BinarySensorEntity):
 
     @property
     def is_on(self) -> bool | None:
-        return self.__motion
+        return self.dingz_pir.get("motion")
 
 
-class MqttOnline(InternalNotificationMixin, BinarySensorEntity):
+class MqttOnline(InternalNotificationMixin[MqttOnlineNotification], BinarySensorEntity):
     _attr_has_entity_name = True
     _attr_translation_key = "mqtt_online"
     _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
@@ -164,10 +157,12 @@ class MqttOnline(InternalNotificationMixin, BinarySensorEntity):
         self._attr_unique_id = f"{shared.mac_addr}-mqtt_online"
         self._attr_device_info = shared.device_info
 
+    @property
+    def notification_route(self) -> NotificationRoute[MqttOnlineNotification]:
+        return (MqttOnlineNotification, None)
+
     @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not isinstance(notification, MqttOnlineNotification):
-            return
+    def handle_notification(self, notification: MqttOnlineNotification) -> None:
         self.__online = notification.online
         self.async_write_ha_state()
 
@@ -0,0 +1,86 @@
+import dataclasses
+import logging
+from collections.abc import Callable
+from typing import Any, TypedDict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from . import api
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_STORAGE_VERSION = 1
+_STORAGE_MINOR_VERSION = 1
+_SAVE_DELAY = 60.0
+
+
+class _StoredDevice(TypedDict):
+    state: api.State
+    config: dict[str, Any]
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class CachedDevice:
+    state: api.State
+    config: api.FullDeviceConfig
+
+
+class _DeviceStore(Store[_StoredDevice]):
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> Any:
+        if old_major_version == _STORAGE_VERSION:
+            # minor versions only add fields, missing ones simply take their default
+            return old_data
+        # The cache can always be rebuilt from the device, so we don't bother migrating it.
+        # Without data the device is simply treated as not being cached.
+        _LOGGER.info(
+            "discarding cached device data with incompatible version %s.%s",
+            old_major_version,
+            old_minor_version,
+        )
+        return None
+
+
+class DeviceCache:
+    """Persists the last known state and config of a device across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = _DeviceStore(
+            hass,
+            _STORAGE_VERSION,
+            f"{DOMAIN}.{entry_id}",
+            minor_version=_STORAGE_MINOR_VERSION,
+        )
+
+    async def async_load(self) -> CachedDevice | None:
+        try:
+            raw = await self._store.async_load()
+        except Exception:
+            _LOGGER.exception("failed to load cached device data")
+            return None
+        if raw is None:
+            return None
+
+        try:
+            return CachedDevice(
+                state=raw["state"],
+                config=api.FullDeviceConfig(**raw["config"]),
+            )
+        except (LookupError, TypeError):
+            _LOGGER.warning("ignoring invalid cached device data")
+            return None
+
+    def async_delay_save(self, data_fn: Callable[[], CachedDevice]) -> None:
+        def to_stored() -> _StoredDevice:
+            data = data_fn()
+            return _StoredDevice(
+                state=data.state, config=dataclasses.asdict(data.config)
+            )
+
+        self._store.async_delay_save(to_stored, _SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
@@ -13,11 +13,14 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import api
 from .const import DOMAIN
-from .helpers import DelayedCoordinatorRefreshMixin
+from .helpers import (
+    ChangeAwareCoordinatorEntity,
+    DelayedCoordinatorRefreshMixin,
+    JsonPath,
+)
 from .shared import Shared, StateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -45,7 +48,7 @@ async def async_setup_entry(
 
 
 class Climate(
-    CoordinatorEntity[StateCoordinator],
+    ChangeAwareCoordinatorEntity[StateCoordinator],
     ClimateEntity,
     DelayedCoordinatorRefreshMixin,
 ):
@@ -61,6 +64,10 @@ class Climate(
         self._attr_target_temperature_step = 1.0  # from web frontend
         self._attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("thermostat",)]
+
     @property
     def current_temperature(self) -> float | None:
         try:
@@ -4,7 +4,7 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.service_info.mqtt import MqttServiceInfo
@@ -12,7 +12,7 @@ from homeassistant.helpers.service_info.zeroconf import ZeroconfServiceInfo
 from yarl import URL
 
 from . import api
-from .const import CONF_BASE_URL, DOMAIN
+from .const import CONF_BASE_URL, CONF_REQUEST_STATISTICS, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -156,5 +156,34 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._info = await validate_input(self.hass, {"host": discovery_info.host})
         return await self.async_step_confirm()
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "OptionsFlow":
+        return OptionsFlow()
+
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_REQUEST_STATISTICS, default=False): bool,
+    }
+)
+
+
+class OptionsFlow(config_entries.OptionsFlow):
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
+
 
 class CannotConnect(HomeAssistantError): ...
@@ -1,3 +1,6 @@
 DOMAIN = "dingz"
 
 CONF_BASE_URL = "base_url"
+CONF_REQUEST_STATISTICS = "request_statistics"
+
+DATA_SCHEDULER = "scheduler"
@@ -1,5 +1,5 @@
 import logging
-from typing import Any
+from typing import Any, Literal
 
 from homeassistant.components.cover import (
     ATTR_POSITION,
@@ -16,9 +16,15 @@ from .const import DOMAIN
 from .helpers import (
     CoordinatedNotificationStateEntity,
     DelayedCoordinatorRefreshMixin,
+    JsonPath,
     UserAssignedNameMixin,
 )
-from .shared import InternalNotification, MotorMotion, MotorStateNotification, Shared
+from .shared import (
+    SHADE_COMMAND_SETTLE_TIME,
+    MotorStateNotification,
+    NotificationRoute,
+    Shared,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,12 +50,13 @@ async def async_setup_entry(
 
 
 class Blind(
-    CoordinatedNotificationStateEntity,
+    CoordinatedNotificationStateEntity[MotorStateNotification],
     CoverEntity,
     UserAssignedNameMixin,
     DelayedCoordinatorRefreshMixin,
 ):
     _attr_translation_key = "blind"
+    _command_settle_time = SHADE_COMMAND_SETTLE_TIME
     _attr_supported_features = (
         CoverEntityFeature.OPEN
         | CoverEntityFeature.CLOSE
@@ -63,7 +70,6 @@ class Blind(
     def __init__(self, shared: Shared, *, index: int) -> None:
         super().__init__(shared)
         self.__index = index
-        self.__blind_state = api.StateBlind()
 
         self._attr_unique_id = f"f{shared.mac_addr}-{index}"
         self._attr_device_info = shared.device_info
@@ -75,6 +81,13 @@ class Blind(
         except LookupError:
             return api.BlindConfig()
 
+    @property
+    def dingz_blind_state(self) -> api.StateBlind:
+        try:
+            return self.coordinator.data["blinds"][self.__index]
+        except LookupError:
+            return api.StateBlind()
+
     @property
     def comp_index(self) -> int:
         return self.__index
@@ -85,19 +98,19 @@ class Blind(
 
     @property
     def current_cover_position(self) -> int | None:
-        return self.__blind_state.get("position")
+        return self.dingz_blind_state.get("position")
 
     @property
     def current_cover_tilt_position(self) -> int | None:
-        return self.__blind_state.get("lamella")
+        return self.dingz_blind_state.get("lamella")
 
     @property
     def is_opening(self) -> bool | None:
-        return self.__blind_state.get("moving") == "up"
+        return self.dingz_blind_state.get("moving") == "up"
 
     @property
     def is_closing(self) -> bool | None:
-        return self.__blind_state.get("moving") == "down"
+        return self.dingz_blind_state.get("moving") == "down"
 
     @property
     def is_closed(self) -> bool | None:
@@ -105,68 +118,62 @@ class Blind(
             return pos == 0
         return None
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, MotorStateNotification)
-            and notification.index == self.__index
-        ):
-            return
-
-        self.__blind_state["lamella"] = notification.lamella
-        self.__blind_state["position"] = notification.position
-        match notification.motion:
-            case MotorMotion.OPENING:
-                self.__blind_state["moving"] = "up"
-            case MotorMotion.CLOSING:
-                self.__blind_state["moving"] = "down"
-            case MotorMotion.STOPPED:
-                self.__blind_state["moving"] = "stop"
-            case _:
-                pass
+    @property
+    def notification_route(self) -> NotificationRoute[MotorStateNotification]:
+        return (MotorStateNotification, self.__index)
 
-        self.async_write_ha_state()
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("blinds", self.__index)]
 
     @callback
-    def handle_state_update(self) -> None:
-        try:
-            state = self.coordinator.data["blinds"][self.__index]
-        except LookupError:
-            return
-        self.__blind_state = state.copy()
+    def _set_optimistic_moving(self, moving: Literal["up", "down", "stop"]) -> None:
+        self.dingz_blind_state["moving"] = moving
+        self.async_write_ha_state()
 
     async def async_open_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind(self.__index, "up")
-        await self.delayed_request_refresh()
+        self._set_optimistic_moving("up")
+        await self.send_command(
+            self.coordinator.shared.client.move_blind(self.__index, "up")
+        )
 
     async def async_close_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind(self.__index, "down")
-        await self.delayed_request_refresh()
+        self._set_optimistic_moving("down")
+        await self.send_command(
+            self.coordinator.shared.client.move_blind(self.__index, "down")
+        )
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind(self.__index, "stop")
-        await self.delayed_request_refresh()
+        self._set_optimistic_moving("stop")
+        await self.send_command(
+            self.coordinator.shared.client.move_blind(self.__index, "stop")
+        )
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind_position(
-            self.__index, blind=kwargs[ATTR_POSITION]
+        position: int = kwargs[ATTR_POSITION]
+        if (current := self.current_cover_position) is not None and current != position:
+            self._set_optimistic_moving("up" if position > current else "down")
+        await self.send_command(
+            self.coordinator.shared.client.move_blind_position(
+                self.__index, blind=position
+            )
         )
-        await self.delayed_request_refresh()
 
-    async def async_open_cover_tilt(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind_position(
-            self.__index, lamella=100
+    async def _set_tilt_position(self, lamella: int) -> None:
+        # tilting is quick enough that we can pretend it's instant
+        self.dingz_blind_state["lamella"] = lamella
+        self.async_write_ha_state()
+        await self.send_command(
+            self.coordinator.shared.client.move_blind_position(
+                self.__index, lamella=lamella
+            )
         )
-        await self.delayed_request_refresh()
+
+    async def async_open_cover_tilt(self, **kwargs: Any) -> None:
+        await self._set_tilt_position(100)
 
     async def async_close_cover_tilt(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind_position(
-            self.__index, lamella=0
-        )
-        await self.delayed_request_refresh()
+        await self._set_tilt_position(0)
 
     async def async_set_cover_tilt_position(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.move_blind_position(
-            self.__index, lamella=kwargs[ATTR_TILT_POSITION]
-        )
-        await self.delayed_request_refresh()
+        await self._set_tilt_position(kwargs[ATTR_TILT_POSITION])
@@ -0,0 +1,63 @@
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .shared import ConfigCoordinator, DiagnosticCoordinator, Shared, StateCoordinator
+
+TO_REDACT = {
+    # wifi
+    "ssid",
+    "mac",
+    "ip",
+    "mask",
+    "gateway",
+    "dns",
+    # mqtt
+    "uri",
+    "server.crt",
+}
+
+
+def _coordinator_diagnostics(
+    coordinator: StateCoordinator | ConfigCoordinator | DiagnosticCoordinator,
+) -> dict[str, Any]:
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds()
+        if coordinator.update_interval is not None
+        else None,
+        "refreshes": [record.as_dict() for record in coordinator.refreshes],
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    shared: Shared = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "scheduler": shared.scheduler.limiter.as_dict(),
+        "device_queue_depth": shared.client.queue_depth,
+        "device_queue_depths": shared.client.queue_depths,
+        "max_concurrency": shared.client.max_concurrency,
+        "throttle_gap": shared.client.throttle_gap,
+        "connections": shared.client.connection_stats.as_dict(),
+        "requests": shared.client.instrumentation.as_dict()
+        if shared.client.instrumentation is not None
+        else None,
+        "command_refresh": shared.state.command_refresh.as_dict(),
+        "coordinators": {
+            "state": _coordinator_diagnostics(shared.state),
+            "config": _coordinator_diagnostics(shared.config),
+            "diagnostic": _coordinator_diagnostics(shared.diag),
+        },
+        "state_snapshots": async_redact_data(
+            [snapshot.as_dict() for snapshot in shared.state.snapshots], TO_REDACT
+        ),
+        "config_snapshots": async_redact_data(
+            [snapshot.as_dict() for snapshot in shared.config.snapshots], TO_REDACT
+        ),
+        "mqtt_messages": [message.as_dict() for message in shared.mqtt_messages],
+    }
@@ -6,7 +6,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from . import api
 from .const import DOMAIN
 from .helpers import InternalNotificationMixin, UserAssignedNameMixin
-from .shared import ButtonNotification, InternalNotification, PirNotification, Shared
+from .shared import ButtonNotification, NotificationRoute, PirNotification, Shared
 
 
 async def async_setup_entry(
@@ -43,7 +43,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class Pir(InternalNotificationMixin, EventEntity):
+class Pir(InternalNotificationMixin[PirNotification], EventEntity):
     _attr_has_entity_name = True
     _attr_device_class = EventDeviceClass.MOTION
     _attr_event_types = ["s", "ss", "n"]
@@ -56,18 +56,19 @@ class Pir(InternalNotificationMixin, EventEntity):
         self._attr_device_info = shared.device_info
         self._attr_translation_key = f"pir_{index}"
 
+    @property
+    def notification_route(self) -> NotificationRoute[PirNotification]:
+        return (PirNotification, self.__index)
+
     @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, PirNotification)
-            and notification.index == self.__index
-        ):
-            return
+    def handle_notification(self, notification: PirNotification) -> None:
         self._trigger_event(notification.event_type)
         self.async_write_ha_state()
 
 
-class Button(InternalNotificationMixin, EventEntity, UserAssignedNameMixin):
+class Button(
+    InternalNotificationMixin[ButtonNotification], EventEntity, UserAssignedNameMixin
+):
     _attr_translation_key = "button"
     _attr_device_class = EventDeviceClass.BUTTON
     _attr_event_types = [
@@ -103,12 +104,11 @@ class Button(InternalNotificationMixin, EventEntity, UserAssignedNameMixin):
     def user_given_name(self) -> str | None:
         return self.dingz_button_config.get("name")
 
+    @property
+    def notification_route(self) -> NotificationRoute[ButtonNotification]:
+        return (ButtonNotification, self.__index)
+
     @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, ButtonNotification)
-            and notification.index == self.__index
-        ):
-            return
+    def handle_notification(self, notification: ButtonNotification) -> None:
         self._trigger_event(notification.event_type)
         self.async_write_ha_state()
@@ -1,36 +1,102 @@
 import abc
-import asyncio
+import functools
+from collections.abc import Awaitable, Callable
 from typing import Any, cast
 
 from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import api
-from .shared import InternalNotification, Shared, StateCoordinator
+from .shared import (
+    COMMAND_SETTLE_TIME,
+    ConfigCoordinator,
+    DiagnosticCoordinator,
+    InternalNotification,
+    JsonPath,
+    NotificationRoute,
+    Shared,
+    StateCoordinator,
+)
 
 
-def compile_json_path(raw: str) -> list[str | int]:
-    path = cast(list[str | int], raw.split("."))
-    for i, seg in enumerate(path):
-        if isinstance(seg, str) and seg.isdigit():
-            path[i] = int(seg)
-    return path
+def memoized_property[EntityT: Entity, ValueT](
+    fn: Callable[[EntityT], ValueT],
+) -> property:
+    """Like `property`, but the value is only computed once per data update.
 
+    The value is computed again once the device state or config changed. Works for coordinator entities
+    as well as entities with a `shared` attribute. Nothing is cached until the entity has been added to a
+    platform, the value may depend on the platform's translations.
+    """
+    name = fn.__name__
 
-def json_path_lookup(value: Any, path: list[str | int]) -> Any | None:
-    if value is None:
-        # The initial value could be 'None' because the state hasn't been fetched yet.
-        return None
-    try:
-        for key in path:
-            value = value[key]
-    except LookupError:
+    @functools.wraps(fn)
+    def getter(self: EntityT) -> ValueT:
+        if self.platform is None:
+            return fn(self)
+        shared: Shared
+        try:
+            shared = self.shared  # type: ignore[attr-defined]
+        except AttributeError:
+            shared = self.coordinator.shared  # type: ignore[attr-defined]
+        generation = (shared.state.generation, shared.config.generation)
+        memo: dict[str, tuple[tuple[int, int], Any]] = self.__dict__.setdefault(
+            "_memoized", {}
+        )
+        if (cached := memo.get(name)) is not None and cached[0] == generation:
+            return cached[1]
+        value = fn(self)
+        memo[name] = (generation, value)
+        return value
+
+    return property(getter)
+
+
+class ChangeAwareCoordinatorEntity[
+    CoordinatorT: StateCoordinator | DiagnosticCoordinator | ConfigCoordinator
+](CoordinatorEntity[CoordinatorT]):
+    """Coordinator entity that skips writing its state if nothing it depends on changed.
+
+    Entities declare the parts of the coordinator data they read in `state_paths`. The coordinator
+    resolves these paths once per update, `path_value` reads the resolved value.
+    """
+
+    _written_available: bool | None = None
+    _written_config: api.FullDeviceConfig | None = None
+
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        """Paths of the coordinator data this entity depends on, `None` if it depends on all of it."""
         return None
-    return value
+
+    def path_value(self, path: JsonPath) -> Any | None:
+        return self.coordinator.path_value(path)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if (paths := self.state_paths) is not None:
+            self.async_on_remove(self.coordinator.track_paths(paths))
+
+    def _state_changed(self) -> bool:
+        if (paths := self.state_paths) is None:
+            return True
+        return any(self.coordinator.path_changed(path) for path in paths)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        # names are taken from the config, so a new config is also a reason to write
+        config = self.coordinator.shared.config.data
+        if (
+            available == self._written_available
+            and config is self._written_config
+            and not self._state_changed()
+        ):
+            return
+        self._written_available = available
+        self._written_config = config
+        super()._handle_coordinator_update()
 
 
 class UserAssignedNameMixin(Entity, abc.ABC):
@@ -44,7 +110,7 @@ class UserAssignedNameMixin(Entity, abc.ABC):
     @abc.abstractmethod
     def user_given_name(self) -> str | None: ...
 
-    @property
+    @memoized_property
     def name(self) -> str | None:
         name = self.user_given_name or ""
 
@@ -65,31 +131,51 @@ class UserAssignedNameMixin(Entity, abc.ABC):
         return tr_fmt.format(name=name, position=self.comp_index + 1)
 
 
-class InternalNotificationMixin(Entity, abc.ABC):
+class InternalNotificationMixin[NotificationT: InternalNotification](Entity, abc.ABC):
     _attr_should_poll = False
 
     def __init__(self, shared: Shared) -> None:
         super().__init__()
         self.shared = shared
 
+    @property
+    @abc.abstractmethod
+    def notification_route(self) -> NotificationRoute[NotificationT] | None:
+        """Notifications this entity is interested in, `None` to not receive any."""
+
     @callback
     @abc.abstractmethod
-    def handle_notification(self, notification: InternalNotification) -> None: ...
+    def handle_notification(self, notification: NotificationT) -> None: ...
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
-        self.async_on_remove(self.shared.add_listener(self.handle_notification))
+        if (route := self.notification_route) is not None:
+            self.async_on_remove(
+                self.shared.add_listener(self.handle_notification, route)
+            )
 
 
 class DelayedCoordinatorRefreshMixin:
+    _command_settle_time: float = COMMAND_SETTLE_TIME
+
     async def delayed_request_refresh(self) -> None:
-        # HACK: dingz takes some time to realize and update its internal state
-        await asyncio.sleep(1.0)
-        coordinator = cast(DataUpdateCoordinator[Any], self.coordinator)  # type: ignore
-        await coordinator.async_request_refresh()
+        coordinator = cast(StateCoordinator, self.coordinator)  # type: ignore
+        coordinator.command_refresh.async_schedule(self._command_settle_time)
 
+    async def send_command(self, command: Awaitable[Any]) -> None:
+        """Send a command and refresh the state afterwards.
 
-class DingzOutputEntity(CoordinatorEntity[StateCoordinator], UserAssignedNameMixin):
+        The refresh also happens if the command failed, which reverts any optimistic state.
+        """
+        try:
+            await command
+        finally:
+            await self.delayed_request_refresh()
+
+
+class DingzOutputEntity(
+    ChangeAwareCoordinatorEntity[StateCoordinator], UserAssignedNameMixin
+):
     def __init__(self, coordinator: StateCoordinator, *, index: int) -> None:
         super().__init__(coordinator)
         self.__index = index
@@ -107,6 +193,10 @@ class DingzOutputEntity(CoordinatorEntity[StateCoordinator], UserAssignedNameMix
         except LookupError:
             return api.StateDimmer()
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("dimmers", self.__index)]
+
     @property
     def dingz_output_config(self) -> api.OutputConfig:
         try:
@@ -119,18 +209,16 @@ class DingzOutputEntity(CoordinatorEntity[StateCoordinator], UserAssignedNameMix
         return self.dingz_output_config.get("name")
 
 
-class CoordinatedNotificationStateEntity(
-    CoordinatorEntity[StateCoordinator], InternalNotificationMixin, abc.ABC
+class CoordinatedNotificationStateEntity[NotificationT: InternalNotification](
+    ChangeAwareCoordinatorEntity[StateCoordinator],
+    InternalNotificationMixin[NotificationT],
+    abc.ABC,
 ):
     def __init__(self, shared: Shared) -> None:
         InternalNotificationMixin.__init__(self, shared)
         super().__init__(shared.state)
 
     @callback
-    @abc.abstractmethod
-    def handle_state_update(self) -> None: ...
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        self.handle_state_update()
-        super()._handle_coordinator_update()
+    def handle_notification(self, notification: NotificationT) -> None:
+        # the notification has already been applied to the coordinator's data
+        self.async_write_ha_state()
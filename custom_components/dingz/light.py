@@ -12,20 +12,22 @@ from homeassistant.components.light.const import (
     LightEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import api
 from .const import DOMAIN
 from .helpers import (
+    ChangeAwareCoordinatorEntity,
     CoordinatedNotificationStateEntity,
     DelayedCoordinatorRefreshMixin,
+    JsonPath,
     UserAssignedNameMixin,
+    memoized_property,
 )
 from .shared import (
-    InternalNotification,
     LightStateNotification,
+    NotificationRoute,
     Shared,
     StateCoordinator,
 )
@@ -51,7 +53,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class FrontLed(CoordinatorEntity[StateCoordinator], LightEntity):
+class FrontLed(ChangeAwareCoordinatorEntity[StateCoordinator], LightEntity):
     def __init__(self, coordinator: StateCoordinator) -> None:
         super().__init__(coordinator)
 
@@ -67,6 +69,10 @@ class FrontLed(CoordinatorEntity[StateCoordinator], LightEntity):
         self._attr_supported_features = LightEntityFeature.TRANSITION
 
     @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("led",)]
+
+    @memoized_property
     def dingz_hsv_tuple(self) -> tuple[int, int, int] | None:
         try:
             raw = self.coordinator.data["led"]["hsv"]
@@ -140,7 +146,7 @@ class FrontLed(CoordinatorEntity[StateCoordinator], LightEntity):
 
 
 class Dimmer(
-    CoordinatedNotificationStateEntity,
+    CoordinatedNotificationStateEntity[LightStateNotification],
     LightEntity,
     UserAssignedNameMixin,
     DelayedCoordinatorRefreshMixin,
@@ -184,35 +190,31 @@ class Dimmer(
     def user_given_name(self) -> str | None:
         return self.dingz_output_config.get("name")
 
-    @property
+    @memoized_property
     def color_mode(self) -> ColorMode | str | None:
         return ColorMode.BRIGHTNESS if self.dingz_dimmable else ColorMode.ONOFF
 
-    @property
+    @memoized_property
     def supported_color_modes(self) -> set[ColorMode] | set[str] | None:
         return {ColorMode.BRIGHTNESS} if self.dingz_dimmable else {ColorMode.ONOFF}
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, LightStateNotification)
-            and notification.index == self.__index
-        ):
-            return
-        match notification.turn:
-            case "on":
-                self._attr_is_on = True
-            case "off":
-                self._attr_is_on = False
-
-        self._attr_brightness = 255 * notification.brightness // 100
-        self.async_write_ha_state()
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("dimmers", self.__index)]
+
+    @property
+    def notification_route(self) -> NotificationRoute[LightStateNotification]:
+        return (LightStateNotification, self.__index)
+
+    @property
+    def is_on(self) -> bool | None:
+        return self.dingz_dimmer_state.get("on")
 
-    @callback
-    def handle_state_update(self) -> None:
-        self._attr_is_on = self.dingz_dimmer_state.get("on")
-        if (output := self.dingz_dimmer_state.get("output")) is not None:
-            self._attr_brightness = 255 * output // 100
+    @property
+    def brightness(self) -> int | None:
+        if (output := self.dingz_dimmer_state.get("output")) is None:
+            return None
+        return 255 * output // 100
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         try:
@@ -222,20 +224,31 @@ class Dimmer(
         else:
             value = 100 * brightness // 255
 
-        await self.coordinator.shared.client.set_dimmer(
-            self.__index, "on", value=value, time=kwargs.get(ATTR_TRANSITION)
+        state = self.dingz_dimmer_state
+        state["on"] = True
+        if value is not None:
+            state["output"] = value
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_dimmer(
+                self.__index, "on", value=value, time=kwargs.get(ATTR_TRANSITION)
+            )
         )
-        await self.delayed_request_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.set_dimmer(
-            self.__index, "off", time=kwargs.get(ATTR_TRANSITION)
+        self.dingz_dimmer_state["on"] = False
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_dimmer(
+                self.__index, "off", time=kwargs.get(ATTR_TRANSITION)
+            )
         )
-        await self.delayed_request_refresh()
 
 
 class Ddi(
-    CoordinatedNotificationStateEntity,
+    CoordinatedNotificationStateEntity[LightStateNotification],
     LightEntity,
     UserAssignedNameMixin,
     DelayedCoordinatorRefreshMixin,
@@ -289,32 +302,28 @@ class Ddi(
     def supported_color_modes(self) -> set[ColorMode] | set[str] | None:
         return {ColorMode.COLOR_TEMP}
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("ddi_channels", self.__index)]
+
+    @property
+    def notification_route(self) -> NotificationRoute[LightStateNotification] | None:
         # TODO: implement
-        return
-        # if not (
-        #     isinstance(notification, LightStateNotification)
-        #     and notification.index == self.__index
-        # ):
-        #     return
-        # match notification.turn:
-        #     case "on":
-        #         self._attr_is_on = True
-        #     case "off":
-        #         self._attr_is_on = False
-
-        # self._attr_brightness = 255 * notification.brightness // 100
-        # self.async_write_ha_state()
-
-    @callback
-    def handle_state_update(self) -> None:
-        channel_state = self.dingz_ddi_channel_state
-        self._attr_is_on = channel_state.get("on")
-        if (output := channel_state.get("brightness")) is not None:
-            self._attr_brightness = 255 * output // 100
-        if (temp := channel_state.get("colour_temperature_k")) is not None:
-            self._attr_color_temp_kelvin = temp
+        return None
+
+    @property
+    def is_on(self) -> bool | None:
+        return self.dingz_ddi_channel_state.get("on")
+
+    @property
+    def brightness(self) -> int | None:
+        if (output := self.dingz_ddi_channel_state.get("brightness")) is None:
+            return None
+        return 255 * output // 100
+
+    @property
+    def color_temp_kelvin(self) -> int | None:
+        return self.dingz_ddi_channel_state.get("colour_temperature_k")
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         color_temperature = kwargs.get(ATTR_COLOR_TEMP_KELVIN)
@@ -332,19 +341,32 @@ class Ddi(
             brightness = self.dingz_ddi_channel_state.get("brightness")
             # If it's still None, we'll let the device deal with it.
 
-        await self.coordinator.shared.client.set_ddi_channel(
-            self.__index,
-            "on",
-            brightness=brightness,
-            color_temperature=color_temperature,
-            time=kwargs.get(ATTR_TRANSITION),
+        state = self.dingz_ddi_channel_state
+        state["on"] = True
+        if brightness is not None:
+            state["brightness"] = brightness
+        if color_temperature is not None:
+            state["colour_temperature_k"] = color_temperature
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_ddi_channel(
+                self.__index,
+                "on",
+                brightness=brightness,
+                color_temperature=color_temperature,
+                time=kwargs.get(ATTR_TRANSITION),
+            )
         )
-        await self.delayed_request_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.set_ddi_channel(
-            self.__index,
-            "off",
-            time=kwargs.get(ATTR_TRANSITION),
+        self.dingz_ddi_channel_state["on"] = False
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_ddi_channel(
+                self.__index,
+                "off",
+                time=kwargs.get(ATTR_TRANSITION),
+            )
         )
-        await self.delayed_request_refresh()
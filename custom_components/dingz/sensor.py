@@ -1,4 +1,3 @@
-import contextlib
 from collections.abc import Callable
 from datetime import date, datetime
 from decimal import Decimal
@@ -11,29 +10,105 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory, UnitOfInformation
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt
 
+from . import api
 from .const import DOMAIN
 from .helpers import (
+    ChangeAwareCoordinatorEntity,
     CoordinatedNotificationStateEntity,
     DingzOutputEntity,
-    compile_json_path,
-    json_path_lookup,
 )
 from .shared import (
+    ConfigCoordinator,
     DiagnosticCoordinator,
-    InternalNotification,
+    JsonPath,
+    NotificationRoute,
     Shared,
     SimpleSensorStateNotification,
     StateCoordinator,
+    compile_json_path,
 )
 
 
+def _dt_with_hass_tz(s: str) -> datetime | None:
+    parsed = dt.parse_datetime(s)
+    if parsed is None:
+        return None
+    return dt.as_utc(parsed)
+
+
+_STATE_SENSORS: tuple[
+    tuple[
+        SensorEntityDescription,
+        Callable[[Any], StateType | date | datetime | Decimal] | None,
+    ],
+    ...,
+] = (
+    (
+        SensorEntityDescription(
+            key="sensors.light_state",
+            device_class=SensorDeviceClass.ENUM,
+            options=["day", "night", "twilight"],
+            translation_key="light_state",
+        ),
+        None,
+    ),
+    (
+        SensorEntityDescription(
+            key="time",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            translation_key="state_time",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        ),
+        _dt_with_hass_tz,
+    ),
+    (
+        SensorEntityDescription(
+            key="config.timestamp",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            translation_key="config_timestamp",
+            entity_category=EntityCategory.DIAGNOSTIC,
+        ),
+        lambda raw: dt.utc_from_timestamp(raw),
+    ),
+    *(
+        (
+            SensorEntityDescription(
+                key=f"sensors.{name}",
+                device_class=SensorDeviceClass.TEMPERATURE,
+                native_unit_of_measurement="°C",
+                state_class=SensorStateClass.MEASUREMENT,
+                entity_category=EntityCategory.DIAGNOSTIC if is_diag else None,
+                translation_key=name,
+            ),
+            None,
+        )
+        for name, is_diag in (
+            ("room_temperature", False),
+            ("uncompensated_temperature", True),
+            ("cpu_temperature", True),
+            ("puck_temperature", True),
+            ("fet_temperature", True),
+        )
+    ),
+)
+"""`JsonPathSensor`s reading the device state, with the transformation of their raw value."""
+
+_DYN_LIGHT_SENSOR = SensorEntityDescription(
+    key="dyn_light.mode",
+    device_class=SensorDeviceClass.ENUM,
+    options=["day", "night", "twilight"],
+    translation_key="dyn_light",
+)
+"""State sensor only added while dynamic light is enabled."""
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -43,35 +118,9 @@ async def async_setup_entry(
 
     entities: list[SensorEntity] = [
         Brightness(shared),
-        JsonPathSensor(
-            shared.state,
-            SensorEntityDescription(
-                key="sensors.light_state",
-                device_class=SensorDeviceClass.ENUM,
-                options=["day", "night", "twilight"],
-                translation_key="light_state",
-            ),
-        ),
-        JsonPathSensor(
-            shared.state,
-            SensorEntityDescription(
-                key="time",
-                device_class=SensorDeviceClass.TIMESTAMP,
-                translation_key="state_time",
-                entity_category=EntityCategory.DIAGNOSTIC,
-                entity_registry_enabled_default=False,
-            ),
-            transform_fn=_dt_with_hass_tz,
-        ),
-        JsonPathSensor(
-            shared.state,
-            SensorEntityDescription(
-                key="config.timestamp",
-                device_class=SensorDeviceClass.TIMESTAMP,
-                translation_key="config_timestamp",
-                entity_category=EntityCategory.DIAGNOSTIC,
-            ),
-            transform_fn=lambda raw: dt.utc_from_timestamp(raw),
+        *(
+            JsonPathSensor(shared.state, desc, transform_fn=transform_fn)
+            for desc, transform_fn in _STATE_SENSORS
         ),
         JsonPathSensor(
             shared.diag,
@@ -99,44 +148,72 @@ async def async_setup_entry(
         ),
     ]
 
-    try:
-        dyn_light_enabled = shared.config.data.system["dyn_light"]["enable"]
-    except LookupError:
-        dyn_light_enabled = False
-
-    if dyn_light_enabled:
+    if (instrumentation := shared.client.instrumentation) is not None:
+        # request statistics are opt-in, so their sensors are enabled right away
+        for key, window in (
+            ("request_latency", instrumentation.total.total),
+            ("request_lock_wait", instrumentation.total.lock_wait),
+            ("request_limiter_wait", instrumentation.total.limiter_wait),
+        ):
+            entities.append(
+                StatisticSensor(
+                    shared,
+                    SensorEntityDescription(
+                        key=key,
+                        state_class=SensorStateClass.MEASUREMENT,
+                        device_class=SensorDeviceClass.DURATION,
+                        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+                        suggested_display_precision=0,
+                        translation_key=f"diag_{key}",
+                        entity_category=EntityCategory.DIAGNOSTIC,
+                    ),
+                    value_fn=lambda _, window=window: _p95_ms(window),
+                )
+            )
         entities.append(
-            JsonPathSensor(
-                shared.state,
+            StatisticSensor(
+                shared,
                 SensorEntityDescription(
-                    key="dyn_light.mode",
-                    device_class=SensorDeviceClass.ENUM,
-                    options=["day", "night", "twilight"],
-                    translation_key="dyn_light",
+                    key="request_errors",
+                    state_class=SensorStateClass.TOTAL_INCREASING,
+                    translation_key="diag_request_errors",
+                    entity_category=EntityCategory.DIAGNOSTIC,
                 ),
+                value_fn=lambda _: instrumentation.total.errors,
             )
         )
 
-    for name, is_diag in (
-        ("room_temperature", False),
-        ("uncompensated_temperature", True),
-        ("cpu_temperature", True),
-        ("puck_temperature", True),
-        ("fet_temperature", True),
+    for name, coordinator in (
+        ("state", shared.state),
+        ("config", shared.config),
+        ("diag", shared.diag),
     ):
-        entities.append(
-            JsonPathSensor(
-                shared.state,
-                SensorEntityDescription(
-                    key=f"sensors.{name}",
-                    device_class=SensorDeviceClass.TEMPERATURE,
-                    native_unit_of_measurement="°C",
-                    state_class=SensorStateClass.MEASUREMENT,
-                    entity_category=EntityCategory.DIAGNOSTIC if is_diag else None,
-                    translation_key=name,
-                ),
-            )
+        entities.extend(_coordinator_statistics(shared, name, coordinator))
+
+    entities.append(
+        StatisticSensor(
+            shared,
+            SensorEntityDescription(
+                key="mqtt_push_latency",
+                state_class=SensorStateClass.MEASUREMENT,
+                device_class=SensorDeviceClass.DURATION,
+                native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+                suggested_display_precision=0,
+                translation_key="diag_mqtt_push_latency",
+                entity_category=EntityCategory.DIAGNOSTIC,
+                entity_registry_enabled_default=False,
+            ),
+            value_fn=lambda shared: _p95_ms(shared.push_latency),
         )
+    )
+
+    try:
+        dyn_light_enabled = shared.config.data.system["dyn_light"]["enable"]
+    except LookupError:
+        dyn_light_enabled = False
+
+    if dyn_light_enabled:
+        entities.append(JsonPathSensor(shared.state, _DYN_LIGHT_SENSOR))
 
     for index, dingz_output in enumerate(shared.config.data.outputs):
         if dingz_output.get("active", False):
@@ -146,13 +223,6 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-def _dt_with_hass_tz(s: str) -> datetime | None:
-    parsed = dt.parse_datetime(s)
-    if parsed is None:
-        return None
-    return dt.as_utc(parsed)
-
-
 class OutputPower(DingzOutputEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.POWER
     _attr_native_unit_of_measurement = "W"
@@ -166,6 +236,10 @@ class OutputPower(DingzOutputEntity, SensorEntity):
             f"{self.coordinator.shared.mac_addr}-output-power-{index}"
         )
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("sensors", "power_outputs", self.comp_index)]
+
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
         try:
@@ -177,7 +251,8 @@ class OutputPower(DingzOutputEntity, SensorEntity):
 
 
 class JsonPathSensor(
-    CoordinatorEntity[StateCoordinator | DiagnosticCoordinator], SensorEntity
+    ChangeAwareCoordinatorEntity[StateCoordinator | DiagnosticCoordinator],
+    SensorEntity,
 ):
     _attr_has_entity_name = True
 
@@ -198,9 +273,13 @@ class JsonPathSensor(
         self.__path = compile_json_path(desc.key)
         self.__transform_fn = transform_fn
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [self.__path]
+
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        value = json_path_lookup(self.coordinator.data, self.__path)
+        value = self.path_value(self.__path)
         if value is None:
             return None
         if self.__transform_fn:
@@ -208,7 +287,96 @@ class JsonPathSensor(
         return value
 
 
-class Brightness(CoordinatedNotificationStateEntity, SensorEntity):
+def _ms(seconds: float | None) -> float | None:
+    if seconds is None:
+        return None
+    return seconds * 1000
+
+
+def _p95_ms(window: api.RollingWindow) -> float | None:
+    return _ms(window.percentile(0.95))
+
+
+def _coordinator_statistics(
+    shared: Shared,
+    name: str,
+    coordinator: StateCoordinator | ConfigCoordinator | DiagnosticCoordinator,
+) -> list[SensorEntity]:
+    return [
+        StatisticSensor(
+            shared,
+            SensorEntityDescription(
+                key=f"{name}_refresh_duration",
+                state_class=SensorStateClass.MEASUREMENT,
+                device_class=SensorDeviceClass.DURATION,
+                native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+                suggested_display_precision=0,
+                translation_key=f"diag_{name}_refresh_duration",
+                entity_category=EntityCategory.DIAGNOSTIC,
+                entity_registry_enabled_default=False,
+            ),
+            value_fn=lambda _: _ms(coordinator.last_refresh_duration),
+        ),
+        StatisticSensor(
+            shared,
+            SensorEntityDescription(
+                key=f"{name}_data_age",
+                state_class=SensorStateClass.MEASUREMENT,
+                device_class=SensorDeviceClass.DURATION,
+                native_unit_of_measurement=UnitOfTime.SECONDS,
+                suggested_display_precision=0,
+                translation_key=f"diag_{name}_data_age",
+                entity_category=EntityCategory.DIAGNOSTIC,
+                entity_registry_enabled_default=False,
+            ),
+            value_fn=lambda _: coordinator.data_age,
+        ),
+        StatisticSensor(
+            shared,
+            SensorEntityDescription(
+                key=f"{name}_refresh_failures",
+                state_class=SensorStateClass.MEASUREMENT,
+                translation_key=f"diag_{name}_refresh_failures",
+                entity_category=EntityCategory.DIAGNOSTIC,
+                entity_registry_enabled_default=False,
+            ),
+            value_fn=lambda _: coordinator.consecutive_failures,
+        ),
+    ]
+
+
+class StatisticSensor(SensorEntity):
+    """Statistics the integration collects about the device.
+
+    These are polled instead of following a coordinator, a coordinator stops notifying its listeners
+    while its refreshes keep failing, which is exactly when these are interesting.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        shared: Shared,
+        desc: SensorEntityDescription,
+        *,
+        value_fn: Callable[[Shared], StateType],
+    ) -> None:
+        self._shared = shared
+        self._attr_unique_id = f"{shared.mac_addr}-{desc.key}"
+        self._attr_device_info = shared.device_info
+        self.entity_description = desc
+
+        self.__value_fn = value_fn
+
+    @property
+    def native_value(self) -> StateType:
+        return self.__value_fn(self._shared)
+
+
+class Brightness(
+    CoordinatedNotificationStateEntity[SimpleSensorStateNotification], SensorEntity
+):
     _attr_device_class = SensorDeviceClass.ILLUMINANCE
     _attr_has_entity_name = True
     _attr_native_unit_of_measurement = "lx"
@@ -217,26 +385,21 @@ class Brightness(CoordinatedNotificationStateEntity, SensorEntity):
 
     def __init__(self, shared: Shared) -> None:
         super().__init__(shared)
-        self.__brightness: float | None = None
 
         self._attr_unique_id = f"{self.coordinator.shared.mac_addr}-sensors.brightness"
         self._attr_device_info = self.coordinator.shared.device_info
 
-    @callback
-    def handle_notification(self, notification: InternalNotification) -> None:
-        if not (
-            isinstance(notification, SimpleSensorStateNotification)
-            and notification.sensor == "light"
-        ):
-            return
-        self.__brightness = notification.value
-        self.async_write_ha_state()
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("sensors", "brightness")]
 
-    @callback
-    def handle_state_update(self) -> None:
-        with contextlib.suppress(LookupError):
-            self.__brightness = self.coordinator.data["sensors"]["brightness"]
+    @property
+    def notification_route(self) -> NotificationRoute[SimpleSensorStateNotification]:
+        return (SimpleSensorStateNotification, "light")
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        return self.__brightness
+        try:
+            return self.coordinator.data["sensors"]["brightness"]
+        except LookupError:
+            return None
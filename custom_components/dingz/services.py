@@ -0,0 +1,105 @@
+import dataclasses
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from . import api
+from .const import DOMAIN
+from .shared import COMMAND_SETTLE_TIME, SHADE_COMMAND_SETTLE_TIME, Shared
+
+SERVICE_SEND_COMMANDS = "send_commands"
+
+ATTR_COMMANDS = "commands"
+
+
+def _validate_command(data: dict[str, Any]) -> dict[str, Any]:
+    try:
+        api.Command(**data).validate()
+    except ValueError as exc:
+        raise vol.Invalid(str(exc)) from exc
+    return data
+
+
+_COMMAND_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required("target"): vol.In(("dimmer", "ddi", "shade", "led")),
+            vol.Optional("index", default=0): vol.All(
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+            vol.Required("action"): cv.string,
+            vol.Optional("value"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional("lamella"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            ),
+            vol.Optional("color"): cv.string,
+            vol.Optional("time"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+    ),
+    _validate_command,
+)
+
+_SEND_COMMANDS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_COMMANDS): vol.All(cv.ensure_list, [_COMMAND_SCHEMA]),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    async def send_commands(call: ServiceCall) -> ServiceResponse:
+        shared = _get_shared(hass, call.data[ATTR_DEVICE_ID])
+        commands = [api.Command(**raw) for raw in call.data[ATTR_COMMANDS]]
+
+        errors = await shared.client.send_commands(commands)
+        shared.state.command_refresh.async_schedule(
+            SHADE_COMMAND_SETTLE_TIME
+            if any(command.target == "shade" for command in commands)
+            else COMMAND_SETTLE_TIME
+        )
+
+        return {
+            "results": [
+                {
+                    "command": dataclasses.asdict(command),
+                    "success": error is None,
+                    "superseded": isinstance(error, api.CommandSupersededError),
+                    "error": str(error) if error is not None else None,
+                }
+                for command, error in zip(commands, errors, strict=True)
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEND_COMMANDS,
+        send_commands,
+        schema=_SEND_COMMANDS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _get_shared(hass: HomeAssistant, device_id: str) -> Shared:
+    device = dr.async_get(hass).async_get(device_id)
+    if device is not None:
+        for entry_id in device.config_entries:
+            shared = hass.data.get(DOMAIN, {}).get(entry_id)
+            if isinstance(shared, Shared):
+                return shared
+
+    raise ServiceValidationError(
+        translation_domain=DOMAIN,
+        translation_key="unknown_device",
+        translation_placeholders={"device_id": device_id},
+    )
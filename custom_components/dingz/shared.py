@@ -1,34 +1,91 @@
+import abc
+import asyncio
+import collections
 import contextlib
+import copy
 import dataclasses
-import json
 import logging
-from collections.abc import Callable
-from datetime import timedelta
+import time
+from collections.abc import Callable, Coroutine, Iterable
+from datetime import datetime, timedelta
 from enum import IntEnum
-from typing import Any, Literal, Union, cast
+from typing import Any, Literal, TypeVar, Union, cast
 
+import aiohttp
 from homeassistant.components import mqtt
 from homeassistant.components.mqtt.subscription import (
     async_prepare_subscribe_topics,
     async_subscribe_topics,
     async_unsubscribe_topics,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt
+from homeassistant.util.json import json_loads
 from yarl import URL
 
 from . import api
-from .const import DOMAIN
+from .cache import CachedDevice, DeviceCache
+from .const import DATA_SCHEDULER, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 
+_MAX_IN_FLIGHT_REQUESTS = 8
+"""Number of requests that may be in flight across all dingz devices."""
+_GOLDEN_RATIO_FRACTION = 0.618033988749895
+_KEEPALIVE_TIMEOUT = 60.0
+"""Seconds an idle connection to a dingz is kept open."""
+_REFRESH_HISTORY_SIZE = 50
+"""Number of recent refreshes each coordinator remembers for the diagnostics."""
+_SNAPSHOT_HISTORY_SIZE = 5
+"""Number of recently fetched payloads each coordinator remembers for the diagnostics."""
+_MQTT_HISTORY_SIZE = 100
+"""Number of recently received MQTT messages remembered for the diagnostics."""
+
+
+class FleetScheduler:
+    """Coordinates the requests of all dingz config entries.
+
+    There is a single instance per Home Assistant instance, stored in `hass.data[DOMAIN]`.
+    """
+
+    def __init__(self, *, keepalive_timeout: float = _KEEPALIVE_TIMEOUT) -> None:
+        self.limiter = api.RequestLimiter(_MAX_IN_FLIGHT_REQUESTS)
+        self.session = api.create_session(keepalive_timeout=keepalive_timeout)
+        self._phase_counter = 0
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> "FleetScheduler":
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        try:
+            return domain_data[DATA_SCHEDULER]
+        except KeyError:
+            scheduler = domain_data[DATA_SCHEDULER] = cls()
+
+            async def close_session(_event: Event) -> None:
+                await scheduler.session.close()
+
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, close_session)
+            return scheduler
+
+    def next_phase(self) -> float:
+        """Fraction of the update interval to delay a coordinator's first periodic refresh by.
+
+        Successive phases are spread evenly so the coordinators of different devices don't refresh at the same time.
+        """
+        self._phase_counter += 1
+        return (self._phase_counter * _GOLDEN_RATIO_FRACTION) % 1.0
+
+
 class Shared:
     hass: HomeAssistant
     client: api.Client
+    scheduler: FleetScheduler
 
     state: "StateCoordinator"
     config: "ConfigCoordinator"
@@ -37,9 +94,20 @@ class Shared:
         self,
         hass: HomeAssistant,
         base_url: URL,
+        entry_id: str,
+        *,
+        request_statistics: bool = False,
     ) -> None:
         self.hass = hass
-        self.client = api.Client(async_get_clientsession(hass), base_url)
+        self.cache = DeviceCache(hass, entry_id)
+        self.scheduler = FleetScheduler.get(hass)
+        self.client = api.Client(
+            self.scheduler.session,
+            base_url,
+            limiter=self.scheduler.limiter,
+            json_loads=json_loads,
+            instrument=request_statistics,
+        )
         self.state = StateCoordinator(self)
         self.diag = DiagnosticCoordinator(self)
         self.config = ConfigCoordinator(self)
@@ -48,6 +116,15 @@ class Shared:
         self._mac_addr: str | None = None
         self._notifier = _Notifier()
         self._sub_state = None
+        self._mqtt_online = False
+        self._last_push_at: float | None = None
+        self._cancel_push_timeout: CALLBACK_TYPE | None = None
+        self.mqtt_messages: collections.deque[ReceivedMqttMessage] = collections.deque(
+            maxlen=_MQTT_HISTORY_SIZE
+        )
+        self.push_latency = api.RollingWindow()
+        """Seconds from receiving an MQTT message until its entities have written their state."""
+        self._reconcile_task: asyncio.Task[None] | None = None
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -58,16 +135,33 @@ class Shared:
         assert self._mac_addr is not None
         return self._mac_addr
 
+    @property
+    def mqtt_push_active(self) -> bool:
+        """Whether the device is online on MQTT and recently pushed state updates."""
+        if not self._mqtt_online or self._last_push_at is None:
+            return False
+        passed = time.monotonic() - self._last_push_at
+        return passed < _MQTT_PUSH_TIMEOUT.total_seconds()
+
     async def async_config_entry_first_refresh(self) -> None:
-        await self.state.async_config_entry_first_refresh()
+        if cached := await self.cache.async_load():
+            # Set up the entities from the last known data right away and catch up with the device in the background.
+            _LOGGER.debug("using cached data for %s", self.client.base_url)
+            self.state.async_set_updated_data(cached.state)
+            self.config.async_restore(cached.config)
+            self._reconcile_task = self.hass.async_create_background_task(
+                self._async_reconcile(), f"{DOMAIN} reconcile {self.client.base_url}"
+            )
+        else:
+            await self.state.async_config_entry_first_refresh()
+            await self.config.async_config_entry_first_refresh()
+            self.async_schedule_cache_save()
+
+        # We don't perform a first refresh on the diagnostic coordinator since its entities are disabled by default.
 
         with contextlib.suppress(LookupError):
             self._mac_addr = dr.format_mac(self.state.data["wifi"]["mac"])
 
-        await self.config.async_config_entry_first_refresh()
-
-        # We don't perform a first refresh on the diagnostic coordinator since its entities are disabled by default.
-
         self._device_info.update(
             DeviceInfo(
                 configuration_url=str(self.client.base_url),
@@ -93,192 +187,634 @@ class Shared:
                         "topic": f"dingz/{dingz_id}/online",
                         "msg_callback": self._handle_mqtt_online,
                     },
+                    # all other topics are decoded by the same handler
                     "pir": {
                         "topic": f"dingz/{dingz_id}/+/event/pir/+",
-                        "msg_callback": self._handle_mqtt_pir,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                     "button": {
                         "topic": f"dingz/{dingz_id}/+/event/button/+",
-                        "msg_callback": self._handle_mqtt_button,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                     "motor": {
                         "topic": f"dingz/{dingz_id}/+/state/motor/+",
-                        "msg_callback": self._handle_mqtt_motor,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                     "input": {
                         "topic": f"dingz/{dingz_id}/+/state/input/+",
-                        "msg_callback": self._handle_mqtt_input,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                     "sensor": {
                         "topic": f"dingz/{dingz_id}/+/sensor/+",
-                        "msg_callback": self._handle_mqtt_sensor,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                     "light": {
                         "topic": f"dingz/{dingz_id}/+/state/light/+",
-                        "msg_callback": self._handle_mqtt_light,
+                        "msg_callback": self._handle_mqtt_message,
                     },
                 },
             )
             await async_subscribe_topics(self.hass, self._sub_state)
 
-    async def unload(self) -> None:
-        self._sub_state = async_unsubscribe_topics(self.hass, self._sub_state)
+    async def _async_reconcile(self) -> None:
+        # A failed refresh marks the coordinator (and thus its entities) as unavailable.
+        await self.state.async_refresh()
+        await self.config.async_refresh()
+        self.async_schedule_cache_save()
 
-    def add_listener(self, callback: "_NotificationCallbackT") -> Callable[[], None]:
-        return self._notifier.add_listener(callback)
+    def async_schedule_cache_save(self) -> None:
+        """Schedule persisting the current state and config.
 
-    async def _handle_mqtt_online(self, msg: mqtt.ReceiveMessage) -> None:
-        self._notifier.dispatch(MqttOnlineNotification(online=msg.payload == "true"))
+        The data is only captured when it's written, so this also persists all state updates until then.
+        """
+        if self.state.data is None or self.config.data is None:
+            return
+        self.cache.async_delay_save(
+            lambda: CachedDevice(state=self.state.data, config=self.config.data)
+        )
 
-    async def _handle_mqtt_pir(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, raw) = msg.topic.rpartition("/")
-        index = int(raw)
-        event_type = cast(_PirEventType, msg.payload)
-        self._notifier.dispatch(PirNotification(index=index, event_type=event_type))
+    async def unload(self) -> None:
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            self._reconcile_task = None
+        self.state.command_refresh.async_cancel()
+        if self._cancel_push_timeout is not None:
+            self._cancel_push_timeout()
+            self._cancel_push_timeout = None
+        self._sub_state = async_unsubscribe_topics(self.hass, self._sub_state)
 
-    async def _handle_mqtt_button(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, raw) = msg.topic.rpartition("/")
-        index = int(raw)
-        self._notifier.dispatch(
-            ButtonNotification(index=index, event_type=cast(Any, msg.payload))
+    def add_listener(
+        self,
+        callback: "Callable[[_NotificationT], None]",
+        route: "NotificationRoute[_NotificationT]",
+    ) -> Callable[[], None]:
+        return self._notifier.add_listener(callback, route)
+
+    @callback
+    def _handle_mqtt_online(self, msg: mqtt.ReceiveMessage) -> None:
+        self._record_mqtt_message(msg)
+        online = msg.payload == "true"
+        was_online = self._mqtt_online
+        self._mqtt_online = online
+        self._notifier.dispatch(MqttOnlineNotification(online=online))
+        if was_online and not online:
+            # we can no longer rely on push updates
+            self.state.update_polling_interval()
+            self.hass.async_create_task(self.state.async_request_refresh())
+
+    def _dispatch_push(self, notification: "InternalNotification") -> None:
+        self._last_push_at = time.monotonic()
+        if self._cancel_push_timeout is None:
+            self._schedule_push_timeout(_MQTT_PUSH_TIMEOUT.total_seconds())
+        self.state.apply_notification(notification)
+        self._notifier.dispatch(notification)
+
+    def _record_mqtt_message(self, msg: mqtt.ReceiveMessage) -> None:
+        # the topic without the 'dingz/{id}' prefix
+        topic = msg.topic.split("/", 2)[-1]
+        self.mqtt_messages.append(
+            ReceivedMqttMessage(
+                received_at=time.time(), topic=topic, payload=msg.payload
+            )
         )
 
-    async def _handle_mqtt_motor(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, raw) = msg.topic.rpartition("/")
-        index = int(raw)
+    def _schedule_push_timeout(self, delay: float) -> None:
+        self._cancel_push_timeout = async_call_later(
+            self.hass, delay, self._async_push_timeout
+        )
 
+    @callback
+    def _async_push_timeout(self, _now: datetime) -> None:
+        """Go back to regular polling once the device stopped pushing updates."""
+        self._cancel_push_timeout = None
+        if self.mqtt_push_active:
+            assert self._last_push_at is not None
+            passed = time.monotonic() - self._last_push_at
+            self._schedule_push_timeout(_MQTT_PUSH_TIMEOUT.total_seconds() - passed)
+            return
+        _LOGGER.debug("no push updates from %s, polling again", self.client.base_url)
+        self.state.update_polling_interval()
+        self.hass.async_create_task(self.state.async_request_refresh())
+
+    @callback
+    def _handle_mqtt_message(self, msg: mqtt.ReceiveMessage) -> None:
+        self._record_mqtt_message(msg)
         try:
-            payload: dict[str, Any] | Any = json.loads(msg.payload)
-            if not isinstance(payload, dict):
-                raise TypeError()
-        except (json.JSONDecodeError, TypeError):
+            notification = _decode_mqtt_message(msg.topic, msg.payload)
+        except (LookupError, TypeError, ValueError):
             _LOGGER.error(
-                "ignoring broken motor notification (topic = %s): %s",
+                "ignoring broken notification (topic = %s): %s",
                 msg.topic,
                 msg.payload,
             )
             return
+        if notification is None:
+            return
+        self._dispatch_push(notification)
+        # the message timestamp is taken from the monotonic clock when the MQTT client received it
+        self.push_latency.add(time.monotonic() - msg.timestamp)
 
-        self._notifier.dispatch(
-            MotorStateNotification(
-                index=index,
-                position=payload["position"],
-                goal=payload.get("goal"),
-                lamella=payload["lamella"],
-                motion=MotorMotion.parse(payload.get("motion", MotorMotion.STOPPED)),
-            )
-        )
 
-    async def _handle_mqtt_sensor(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, sensor) = msg.topic.rpartition("/")
+@dataclasses.dataclass(slots=True, kw_only=True)
+class ReceivedMqttMessage:
+    received_at: float
+    """Unix timestamp of when the message was received."""
+    topic: str
+    payload: Any
 
-        try:
-            value = float(msg.payload)
-        except ValueError:
-            _LOGGER.error(
-                "ignoring broken sensor notification (topic = %s): %s",
-                msg.topic,
-                msg.payload,
-            )
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "received_at": dt.utc_from_timestamp(self.received_at).isoformat(),
+            "topic": self.topic,
+            "payload": str(self.payload),
+        }
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class RefreshRecord:
+    started_at: float
+    """Unix timestamp of when the refresh started."""
+    duration: float
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": dt.utc_from_timestamp(self.started_at).isoformat(),
+            "duration": self.duration,
+            "error": self.error,
+        }
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class PayloadSnapshot:
+    fetched_at: float
+    """Unix timestamp of when the payload was fetched."""
+    data: Any
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fetched_at": dt.utc_from_timestamp(self.fetched_at).isoformat(),
+            "data": self.data,
+        }
+
+
+_STATE_UPDATE_INTERVAL = timedelta(seconds=30)
+
+COMMAND_SETTLE_TIME = 1.0
+"""Time the dingz needs to realize and update its internal state after a command."""
+SHADE_COMMAND_SETTLE_TIME = 3.0
+"""Shade motors take a while to start and report their movement."""
+_MQTT_STATE_UPDATE_INTERVAL = timedelta(minutes=5)
+"""Update interval of the state while the device pushes its state via MQTT."""
+_MQTT_PUSH_TIMEOUT = timedelta(minutes=2)
+"""Time without any push updates after which we no longer consider MQTT to be active."""
+
+
+class CommandRefreshScheduler:
+    """Merges the state refreshes requested after commands into a single refresh.
+
+    The refresh happens once the device had time to settle after the last command.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, refresh: Callable[[], Coroutine[Any, Any, None]]
+    ) -> None:
+        self._hass = hass
+        self._refresh = refresh
+        self._deadline: float | None = None
+        self._cancel_timer: Callable[[], None] | None = None
+        self._requests = 0
+        self._refreshes = 0
+
+    @callback
+    def async_schedule(self, settle_time: float) -> None:
+        self._requests += 1
+        deadline = time.monotonic() + settle_time
+        if self._deadline is not None and self._deadline >= deadline:
             return
-        self._notifier.dispatch(
-            SimpleSensorStateNotification(sensor=cast(Any, sensor), value=value)
-        )
 
-    async def _handle_mqtt_input(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, raw) = msg.topic.rpartition("/")
-        index = int(raw)
-        self._notifier.dispatch(
-            InputStateNotification(index=index, on=msg.payload == "1")
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+        self._deadline = deadline
+        self._cancel_timer = async_call_later(self._hass, settle_time, self._async_fire)
+
+    async def _async_fire(self, _now: datetime) -> None:
+        self._cancel_timer = None
+        self._deadline = None
+        self._refreshes += 1
+        await self._refresh()
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        self._deadline = None
+
+    def as_dict(self) -> dict[str, Any]:
+        pending = self._cancel_timer is not None
+        return {
+            "requests": self._requests,
+            "refreshes": self._refreshes,
+            "coalesced": self._requests - self._refreshes - int(pending),
+            "pending": pending,
+        }
+
+
+type JsonPath = tuple[str | int, ...]
+
+
+def compile_json_path(raw: str) -> JsonPath:
+    return tuple(int(seg) if seg.isdigit() else seg for seg in raw.split("."))
+
+
+def json_path_lookup(value: Any, path: JsonPath) -> Any | None:
+    if value is None:
+        # The initial value could be 'None' because the state hasn't been fetched yet.
+        return None
+    try:
+        for key in path:
+            value = value[key]
+    except LookupError:
+        return None
+    return value
+
+
+class _KeepLastKnownData(Exception):
+    """Raised from `_async_fetch_data` if the refresh failed, but the current data should be kept.
+
+    The refresh still counts as failed, the data just doesn't become unavailable.
+    """
+
+
+class _NothingFetched(Exception):
+    """Raised from `_async_fetch_data` if the current data is still up to date and nothing was fetched.
+
+    The skipped refresh is neither recorded nor does it change the age of the data.
+    """
+
+
+class _Coordinator[DataT](DataUpdateCoordinator[DataT], abc.ABC):
+    """Base coordinator.
+
+    Entities can register the paths of the data they read with `track_paths`. These are resolved once
+    per update into a value table, which also records which of the values changed.
+
+    The duration and outcome of the recent refreshes are kept in `refreshes`, subclasses fetch the data
+    in `_async_fetch_data`.
+    """
+
+    shared: Shared
+
+    def __init__(
+        self,
+        shared: Shared,
+        *,
+        update_interval: timedelta,
+        always_update: bool = True,
+    ) -> None:
+        super().__init__(
+            shared.hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=update_interval,
+            always_update=always_update,
+        )
+        self.shared = shared
+        self._phase: float | None = shared.scheduler.next_phase()
+        self.generation = 0
+        """Incremented whenever the data changes, used to invalidate values derived from it."""
+        self._tracked_paths: collections.Counter[JsonPath] = collections.Counter()
+        self._path_values: dict[JsonPath, Any] = {}
+        self._changed_paths: set[JsonPath] = set()
+        self.refreshes: collections.deque[RefreshRecord] = collections.deque(
+            maxlen=_REFRESH_HISTORY_SIZE
         )
+        self.consecutive_failures = 0
+        self._data_updated_at: float | None = None
 
-    async def _handle_mqtt_light(self, msg: mqtt.ReceiveMessage) -> None:
-        (_, _, raw) = msg.topic.rpartition("/")
-        index = int(raw)
+    @property
+    def data_age(self) -> float | None:
+        """Seconds since the data was last fetched from (or pushed by) the device."""
+        if self._data_updated_at is None:
+            return None
+        return time.monotonic() - self._data_updated_at
 
+    @property
+    def last_refresh_duration(self) -> float | None:
+        if not self.refreshes:
+            return None
+        return self.refreshes[-1].duration
+
+    def track_paths(self, paths: Iterable[JsonPath]) -> CALLBACK_TYPE:
+        """Resolve the given paths on every update until the returned callback is called."""
+        paths = list(paths)
+        self._tracked_paths.update(paths)
+        self._resolve_paths()
+
+        @callback
+        def untrack() -> None:
+            self._tracked_paths.subtract(paths)
+            for path in paths:
+                if self._tracked_paths[path] <= 0:
+                    del self._tracked_paths[path]
+                    self._path_values.pop(path, None)
+
+        return untrack
+
+    def path_value(self, path: JsonPath) -> Any | None:
         try:
-            payload: dict[str, Any] | Any = json.loads(msg.payload)
-            if not isinstance(payload, dict):
-                raise TypeError()
-        except (json.JSONDecodeError, TypeError):
-            _LOGGER.error(
-                "ignoring broken light notification (topic = %s): %s",
-                msg.topic,
-                msg.payload,
-            )
-            return
-        self._notifier.dispatch(
-            LightStateNotification(
-                index=index,
-                turn=payload["turn"],
-                brightness=payload["brightness"],
-                exception=payload["exception"],
+            return self._path_values[path]
+        except KeyError:
+            return json_path_lookup(self._path_root(), path)
+
+    def path_changed(self, path: JsonPath) -> bool:
+        """Whether the value of a tracked path changed with the current update."""
+        return path in self._changed_paths
+
+    def _path_root(self) -> Any:
+        return self.data
+
+    def _resolve_paths(self) -> None:
+        root = self._path_root()
+        self._path_values = {
+            path: json_path_lookup(root, path) for path in self._tracked_paths
+        }
+
+    @callback
+    def async_update_listeners(self) -> None:
+        self.generation += 1
+        previous = self._path_values
+        self._resolve_paths()
+        self._changed_paths = {
+            path
+            for path, value in self._path_values.items()
+            if previous.get(path) != value
+        }
+        super().async_update_listeners()
+
+    @abc.abstractmethod
+    async def _async_fetch_data(self) -> DataT: ...
+
+    async def _async_update_data(self) -> DataT:
+        started_at = time.time()
+        start = time.monotonic()
+        try:
+            data = await self._async_fetch_data()
+        except _NothingFetched:
+            return cast(DataT, self.data)
+        except _KeepLastKnownData as exc:
+            self._record_failure(started_at, start, exc.__cause__ or exc)
+            return cast(DataT, self.data)
+        except Exception as exc:
+            self._record_failure(started_at, start, exc)
+            raise
+        self._data_updated_at = time.monotonic()
+        self.refreshes.append(
+            RefreshRecord(started_at=started_at, duration=self._data_updated_at - start)
+        )
+        self.consecutive_failures = 0
+        return data
+
+    def _record_failure(
+        self, started_at: float, start: float, exc: BaseException
+    ) -> None:
+        self.refreshes.append(
+            RefreshRecord(
+                started_at=started_at,
+                duration=time.monotonic() - start,
+                error=f"{type(exc).__name__}: {exc}",
             )
         )
+        self.consecutive_failures += 1
 
+    def _set_update_interval(self, interval: timedelta) -> None:
+        """Set the update interval, delaying the first periodic refresh by the coordinator's phase."""
+        if self._phase is not None:
+            interval += interval * self._phase
+            self._phase = None
+        self.update_interval = interval
 
-class StateCoordinator(DataUpdateCoordinator[api.State]):
-    shared: Shared
 
+class StateCoordinator(_Coordinator[api.State]):
     def __init__(
         self,
         shared: Shared,
     ) -> None:
-        super().__init__(
-            shared.hass, _LOGGER, name=DOMAIN, update_interval=timedelta(seconds=30)
+        super().__init__(shared, update_interval=_STATE_UPDATE_INTERVAL)
+        self._base_interval = _STATE_UPDATE_INTERVAL
+        self.command_refresh = CommandRefreshScheduler(shared.hass, self.async_refresh)
+        self.snapshots: collections.deque[PayloadSnapshot] = collections.deque(
+            maxlen=_SNAPSHOT_HISTORY_SIZE
         )
-        self.shared = shared
 
-    async def _async_update_data(self) -> api.State:
+    def apply_notification(self, notification: "InternalNotification") -> None:
+        """Apply a pushed notification to the current state.
+
+        This doesn't notify the coordinator's listeners, only the listeners of the notification itself are notified.
+        """
+        if self.data is not None:
+            _patch_state(self.data, notification)
+            self._data_updated_at = time.monotonic()
+            self.generation += 1
+            self._resolve_paths()
+
+    def update_polling_interval(self) -> None:
+        """Poll less frequently while the device pushes its state via MQTT."""
+        if self.shared.mqtt_push_active:
+            interval = _MQTT_STATE_UPDATE_INTERVAL
+        else:
+            interval = _STATE_UPDATE_INTERVAL
+        if interval != self._base_interval:
+            _LOGGER.debug("changing state update interval to %s", interval)
+            self._base_interval = interval
+        self._set_update_interval(interval)
+
+    @property
+    def config_timestamp(self) -> int | None:
+        return _config_timestamp(self.data)
+
+    async def _async_fetch_data(self) -> api.State:
         try:
-            return await self.shared.client.get_state()
+            state = await self.shared.client.get_state()
         except Exception:
             _LOGGER.exception("update state data failed")
             raise
+        # notifications patch the state in place, so the snapshot needs its own copy
+        self.snapshots.append(
+            PayloadSnapshot(fetched_at=time.time(), data=copy.deepcopy(state))
+        )
 
+        timestamp = _config_timestamp(state)
+        if (
+            timestamp is not None
+            and self.data is not None
+            and self.shared.config.data is not None
+            and timestamp != self.config_timestamp
+        ):
+            _LOGGER.debug(
+                "config timestamp changed to %s, refreshing config", timestamp
+            )
+            self.hass.async_create_task(
+                self.shared.config.async_request_refresh_for(timestamp)
+            )
 
-class DiagnosticCoordinator(DataUpdateCoordinator[api.Ram]):
-    shared: Shared
+        self.update_polling_interval()
+        return state
+
+
+_DIAGNOSTIC_UPDATE_INTERVAL = timedelta(seconds=60)
 
+
+class DiagnosticCoordinator(_Coordinator[api.Ram]):
     def __init__(
         self,
         shared: Shared,
     ) -> None:
-        super().__init__(
-            shared.hass, _LOGGER, name=DOMAIN, update_interval=timedelta(seconds=60)
-        )
-        self.shared = shared
+        super().__init__(shared, update_interval=_DIAGNOSTIC_UPDATE_INTERVAL)
 
-    async def _async_update_data(self) -> api.Ram:
+    async def _async_fetch_data(self) -> api.Ram:
         try:
-            return await self.shared.client.get_ram()
+            data = await self.shared.client.get_ram()
         except Exception:
             _LOGGER.exception("update ram data failed")
             raise
 
+        self._set_update_interval(_DIAGNOSTIC_UPDATE_INTERVAL)
+        return data
+
+
+def _config_timestamp(state: api.State | None) -> int | None:
+    if state is None:
+        return None
+    try:
+        return state["config"]["timestamp"]
+    except LookupError:
+        return None
 
-class ConfigCoordinator(DataUpdateCoordinator[api.FullDeviceConfig]):
-    shared: Shared
+
+_CONFIG_UPDATE_INTERVAL = timedelta(minutes=5)
+_MAX_CONFIG_AGE = timedelta(hours=1)
+
+
+class ConfigCoordinator(_Coordinator[api.FullDeviceConfig]):
+    """Fetches the full device config.
+
+    The periodic refresh only fetches the config if the config timestamp reported in the state changed
+    (or the config is older than `_MAX_CONFIG_AGE`). Explicitly requested refreshes always fetch.
+    """
 
     def __init__(
         self,
         shared: Shared,
     ) -> None:
         super().__init__(
-            shared.hass, _LOGGER, name=DOMAIN, update_interval=timedelta(minutes=5)
+            shared, update_interval=_CONFIG_UPDATE_INTERVAL, always_update=False
         )
-        self.shared = shared
 
-    async def _async_update_data(self) -> api.FullDeviceConfig:
+        self._fetched_timestamp: int | None = None
+        self._reported_timestamp: int | None = None
+        self._fetched_at = 0.0
+        self._force_refresh = False
+        self._restored = False
+        self.snapshots: collections.deque[PayloadSnapshot] = collections.deque(
+            maxlen=_SNAPSHOT_HISTORY_SIZE
+        )
+
+    @callback
+    def async_restore(self, data: api.FullDeviceConfig) -> None:
+        """Use config restored from the cache until it's been verified with the device."""
+        self._restored = True
+        self.async_set_updated_data(data)
+
+    async def async_request_refresh(self) -> None:
+        self._force_refresh = True
+        await super().async_request_refresh()
+
+    async def async_request_refresh_for(self, timestamp: int) -> None:
+        """Refresh the config because the state reported a new config timestamp.
+
+        The state coordinator hasn't stored the new state yet when it requests the refresh, so the
+        timestamp is passed along instead of being read from it.
+        """
+        self._reported_timestamp = timestamp
+        await self.async_request_refresh()
+
+    def _is_up_to_date(self) -> bool:
+        if self.data is None or self._force_refresh:
+            return False
+        timestamp = self.shared.state.config_timestamp
+        if timestamp is None or timestamp != self._fetched_timestamp:
+            return False
+        # the timestamp only confirms the config if the state it comes from is current
+        if not self.shared.state.last_update_success:
+            return False
+        return time.monotonic() - self._fetched_at < _MAX_CONFIG_AGE.total_seconds()
+
+    def _path_root(self) -> Any:
+        return self.data.services if self.data is not None else None
+
+    async def _async_fetch_data(self) -> api.FullDeviceConfig:
+        self._set_update_interval(_CONFIG_UPDATE_INTERVAL)
+        if self._is_up_to_date():
+            _LOGGER.debug("config timestamp unchanged, skipping config refresh")
+            raise _NothingFetched
+
+        # remember the timestamp from before the fetch so a change during the fetch isn't lost
+        timestamp = self.shared.state.config_timestamp
+        if self._reported_timestamp is not None:
+            timestamp, self._reported_timestamp = self._reported_timestamp, None
+        known = self.data if self._restored and not self._force_refresh else None
         try:
-            return await self.shared.client.get_full_device_config()
+            data = await self.shared.client.get_full_device_config(known=known)
+        except (
+            api.NotEnoughRamError,
+            api.DeviceUnavailableError,
+            aiohttp.ClientError,
+            TimeoutError,
+        ) as exc:
+            if self.data is None:
+                _LOGGER.exception("update config data failed")
+                raise
+            # the config rarely changes, it's better to keep using the one we have than to lose it
+            _LOGGER.warning(
+                "update config data failed, keeping last known config: %s", exc
+            )
+            raise _KeepLastKnownData from exc
         except Exception:
             _LOGGER.exception("update config data failed")
             raise
 
+        self._restored = False
+        self.snapshots.append(
+            PayloadSnapshot(fetched_at=time.time(), data=dataclasses.asdict(data))
+        )
+
+        self._fetched_timestamp = timestamp
+        self._fetched_at = time.monotonic()
+        self._force_refresh = False
+        self.shared.async_schedule_cache_save()
+        return data
+
 
 @dataclasses.dataclass(slots=True)
-class InternalNotification: ...
+class InternalNotification:
+    @property
+    def route_key(self) -> "RouteKeyT":
+        """Key used to route the notification to the listeners interested in it.
+
+        Notifications without a meaningful key (e.g. there's only one of them per device) use `None`.
+        """
+        return None
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class _IndexedNotification(InternalNotification):
+    index: int
+
+    @property
+    def route_key(self) -> "RouteKeyT":
+        return self.index
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
@@ -290,14 +826,12 @@ _PirEventType = Literal["s"] | Literal["ss"] | Literal["n"]
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
-class PirNotification(InternalNotification):
-    index: int
+class PirNotification(_IndexedNotification):
     event_type: _PirEventType
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
-class ButtonNotification(InternalNotification):
-    index: int
+class ButtonNotification(_IndexedNotification):
     event_type: (
         Literal["p"]
         | Literal["r"]
@@ -340,8 +874,7 @@ class MotorMotion(IntEnum):
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
-class MotorStateNotification(InternalNotification):
-    index: int
+class MotorStateNotification(_IndexedNotification):
     position: int
     goal: int | None
     lamella: int
@@ -353,36 +886,173 @@ class SimpleSensorStateNotification(InternalNotification):
     sensor: Literal["light"] | Literal["temperature"]
     value: float
 
+    @property
+    def route_key(self) -> "RouteKeyT":
+        return self.sensor
+
 
 @dataclasses.dataclass(slots=True, kw_only=True)
-class InputStateNotification(InternalNotification):
-    index: int
+class InputStateNotification(_IndexedNotification):
     on: bool
 
 
 @dataclasses.dataclass(slots=True, kw_only=True)
-class LightStateNotification(InternalNotification):
-    index: int
+class LightStateNotification(_IndexedNotification):
     turn: Literal["on"] | Literal["off"]
     brightness: int
     exception: int
 
 
-_NotificationCallbackT = Callable[[InternalNotification], None]
+def _decode_pir(key: str, payload: Any) -> PirNotification:
+    return PirNotification(index=int(key), event_type=cast(_PirEventType, payload))
+
+
+def _decode_button(key: str, payload: Any) -> ButtonNotification:
+    return ButtonNotification(index=int(key), event_type=payload)
+
+
+def _decode_json_object(payload: Any) -> dict[str, Any]:
+    value = json_loads(payload)
+    if not isinstance(value, dict):
+        raise TypeError("expected a JSON object")
+    return value
+
+
+def _decode_motor(key: str, payload: Any) -> MotorStateNotification:
+    value = _decode_json_object(payload)
+    return MotorStateNotification(
+        index=int(key),
+        position=value["position"],
+        goal=value.get("goal"),
+        lamella=value["lamella"],
+        motion=MotorMotion.parse(value.get("motion", MotorMotion.STOPPED)),
+    )
+
+
+def _decode_sensor(key: str, payload: Any) -> SimpleSensorStateNotification:
+    return SimpleSensorStateNotification(sensor=cast(Any, key), value=float(payload))
+
+
+def _decode_input(key: str, payload: Any) -> InputStateNotification:
+    return InputStateNotification(index=int(key), on=payload == "1")
+
+
+def _decode_light(key: str, payload: Any) -> LightStateNotification:
+    value = _decode_json_object(payload)
+    return LightStateNotification(
+        index=int(key),
+        turn=value["turn"],
+        brightness=value["brightness"],
+        exception=value["exception"],
+    )
+
+
+_MQTT_DECODERS: dict[tuple[str, ...], Callable[[str, Any], InternalNotification]] = {
+    ("event", "pir"): _decode_pir,
+    ("event", "button"): _decode_button,
+    ("state", "motor"): _decode_motor,
+    ("state", "input"): _decode_input,
+    ("state", "light"): _decode_light,
+    ("sensor",): _decode_sensor,
+}
+"""Decoders by topic family, i.e. the topic levels between the component and the index."""
+
+
+def _decode_mqtt_message(topic: str, payload: Any) -> InternalNotification | None:
+    """Decode a pushed message, `None` if its topic isn't handled.
+
+    Broken payloads raise a `LookupError`, `TypeError` or `ValueError`.
+    """
+    # topics look like 'dingz/{id}/{component}/{family...}/{key}'
+    parts = topic.split("/")
+    decoder = _MQTT_DECODERS.get(tuple(parts[3:-1]))
+    if decoder is None:
+        return None
+    return decoder(parts[-1], payload)
+
+
+def _patch_state(state: api.State, notification: InternalNotification) -> None:
+    try:
+        match notification:
+            case LightStateNotification():
+                dimmer = state["dimmers"][notification.index]
+                dimmer["on"] = notification.turn == "on"
+                dimmer["output"] = notification.brightness
+            case MotorStateNotification():
+                blind = state["blinds"][notification.index]
+                blind["position"] = notification.position
+                blind["lamella"] = notification.lamella
+                match notification.motion:
+                    case MotorMotion.OPENING:
+                        blind["moving"] = "up"
+                    case MotorMotion.CLOSING:
+                        blind["moving"] = "down"
+                    case MotorMotion.STOPPED:
+                        blind["moving"] = "stop"
+                    case _:
+                        pass
+            case InputStateNotification():
+                state["sensors"]["input_state"] = notification.on
+            case PirNotification():
+                if (pir := state["sensors"]["pirs"][notification.index]) is not None:
+                    pir["motion"] = notification.event_type != "n"
+            case SimpleSensorStateNotification(sensor="light"):
+                state["sensors"]["brightness"] = notification.value
+            case _:
+                pass
+    except LookupError:
+        _LOGGER.debug("unable to apply %s to the state", notification)
+
+
+RouteKeyT = int | str | None
+_NotificationT = TypeVar("_NotificationT", bound=InternalNotification)
+NotificationRoute = tuple[type[_NotificationT], RouteKeyT]
+"""Notification type and route key a listener is interested in.
+
+A key of `None` matches all notifications of the type.
+"""
+
+_NotificationCallbackT = Callable[[Any], None]
 
 
 class _Notifier:
     def __init__(self) -> None:
-        self._listeners: dict[Callable[[], None], _NotificationCallbackT] = {}
+        self._routes: dict[
+            tuple[type[InternalNotification], RouteKeyT],
+            dict[Callable[[], None], _NotificationCallbackT],
+        ] = {}
+
+    def add_listener(
+        self,
+        callback: Callable[[_NotificationT], None],
+        route: NotificationRoute[_NotificationT],
+    ) -> Callable[[], None]:
+        listeners = self._routes.setdefault(route, {})
 
-    def add_listener(self, callback: _NotificationCallbackT) -> Callable[[], None]:
         def remove_listener() -> None:
-            self._listeners.pop(remove_listener)
+            listeners.pop(remove_listener)
+            if not listeners and self._routes.get(route) is listeners:
+                del self._routes[route]
 
-        self._listeners[remove_listener] = callback
+        listeners[remove_listener] = callback
         return remove_listener
 
     def dispatch(self, notification: InternalNotification) -> None:
-        _LOGGER.debug("dispatching %s", notification)
-        for update_callback in list(self._listeners.values()):
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("dispatching %s", notification)
+        notification_type = type(notification)
+        key = notification.route_key
+        if key is not None:
+            self._dispatch_route((notification_type, key), notification)
+        self._dispatch_route((notification_type, None), notification)
+
+    def _dispatch_route(
+        self,
+        route: tuple[type[InternalNotification], RouteKeyT],
+        notification: InternalNotification,
+    ) -> None:
+        listeners = self._routes.get(route)
+        if not listeners:
+            return
+        for update_callback in list(listeners.values()):
             update_callback(notification)
@@ -9,17 +9,21 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import api
 from .const import DOMAIN
 from .helpers import (
+    ChangeAwareCoordinatorEntity,
     DelayedCoordinatorRefreshMixin,
     UserAssignedNameMixin,
+)
+from .shared import (
+    ConfigCoordinator,
+    JsonPath,
+    Shared,
+    StateCoordinator,
     compile_json_path,
-    json_path_lookup,
 )
-from .shared import ConfigCoordinator, Shared, StateCoordinator
 
 
 async def async_setup_entry(
@@ -51,7 +55,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], SwitchEntity):
+class MqttJsonPath(ChangeAwareCoordinatorEntity[ConfigCoordinator], SwitchEntity):
     def __init__(
         self,
         coordinator: ConfigCoordinator,
@@ -64,12 +68,15 @@ class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], SwitchEntity):
         self._attr_device_info = self.coordinator.shared.device_info
         self.entity_description = desc
 
-        self.__path = ["mqtt", *compile_json_path(desc.key)]
+        self.__path = ("mqtt", *compile_json_path(desc.key))
+
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [self.__path]
 
     @property
     def is_on(self) -> bool | None:
-        value = json_path_lookup(self.coordinator.data.services, self.__path)
-        return value
+        return self.path_value(self.__path)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._set(True)
@@ -78,14 +85,16 @@ class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], SwitchEntity):
         await self._set(False)
 
     async def _set(self, value: bool) -> None:
-        config = self.coordinator.data.services.get("mqtt", api.ServicesConfigMqtt())
+        config = api.ServicesConfigMqtt(
+            **self.coordinator.data.services.get("mqtt", {})
+        )
         config[self.entity_description.key] = value
         await self.coordinator.shared.client.update_mqtt_service_config(config)
         await self.coordinator.async_request_refresh()
 
 
 class PowerSocket(
-    CoordinatorEntity[StateCoordinator],
+    ChangeAwareCoordinatorEntity[StateCoordinator],
     SwitchEntity,
     UserAssignedNameMixin,
     DelayedCoordinatorRefreshMixin,
@@ -100,6 +109,10 @@ class PowerSocket(
         self._attr_device_info = shared.device_info
         self._attr_translation_key = "power_socket"
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [("dimmers", self.__index)]
+
     @property
     def dingz_output_config(self) -> api.OutputConfig:
         try:
@@ -127,9 +140,17 @@ class PowerSocket(
         return self.dingz_dimmer_state.get("on")
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.set_dimmer(self.__index, "on")
-        await self.delayed_request_refresh()
+        self.dingz_dimmer_state["on"] = True
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_dimmer(self.__index, "on")
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.coordinator.shared.client.set_dimmer(self.__index, "off")
-        await self.delayed_request_refresh()
+        self.dingz_dimmer_state["on"] = False
+        self.async_write_ha_state()
+
+        await self.send_command(
+            self.coordinator.shared.client.set_dimmer(self.__index, "off")
+        )
@@ -3,12 +3,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import api
 from .const import DOMAIN
-from .helpers import compile_json_path, json_path_lookup
-from .shared import ConfigCoordinator, Shared
+from .helpers import ChangeAwareCoordinatorEntity
+from .shared import ConfigCoordinator, JsonPath, Shared, compile_json_path
 
 
 async def async_setup_entry(
@@ -42,7 +41,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], TextEntity):
+class MqttJsonPath(ChangeAwareCoordinatorEntity[ConfigCoordinator], TextEntity):
     def __init__(
         self,
         coordinator: ConfigCoordinator,
@@ -57,12 +56,16 @@ class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], TextEntity):
         self._attr_device_info = self.coordinator.shared.device_info
         self.entity_description = desc
 
-        self.__path = ["mqtt", *compile_json_path(desc.key)]
+        self.__path = ("mqtt", *compile_json_path(desc.key))
         self.__none_if_empty = none_if_empty
 
+    @property
+    def state_paths(self) -> list[JsonPath] | None:
+        return [self.__path]
+
     @property
     def native_value(self) -> str | None:
-        value = json_path_lookup(self.coordinator.data.services, self.__path)
+        value = self.path_value(self.__path)
         if value is None and self.__none_if_empty:
             value = ""
         return value
@@ -72,7 +75,9 @@ class MqttJsonPath(CoordinatorEntity[ConfigCoordinator], TextEntity):
         if self.__none_if_empty and value == "":
             value = None
 
-        config = self.coordinator.data.services.get("mqtt", api.ServicesConfigMqtt())
+        config = api.ServicesConfigMqtt(
+            **self.coordinator.data.services.get("mqtt", {})
+        )
         config[self.entity_description.key] = value
         await self.coordinator.shared.client.update_mqtt_service_config(config)
         await self.coordinator.async_request_refresh()
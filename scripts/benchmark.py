@@ -0,0 +1,671 @@
+"""Benchmarks the integration against simulated devices.
+
+Results are emitted as JSON so they can be compared between releases. The client benchmarks only
+need aiohttp. The ones exercising the integration itself, up to config entries set up by a running
+Home Assistant instance, need Home Assistant (see `scripts/setup.sh`) and are skipped without it. Run from the repository root:
+
+    python scripts/benchmark.py --devices 1 10 50 100 200 --output bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import importlib.util
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any, cast
+
+_ROOT = Path(__file__).parents[1]
+# api.py doesn't depend on Home Assistant, unlike the package's __init__, so it's imported on its own
+sys.path[:0] = [str(_ROOT / "custom_components/dingz"), str(_ROOT)]
+
+import api  # noqa: E402
+from simulator import (  # noqa: E402
+    DeviceOptions,
+    Fleet,
+    RamModel,
+    RecordingPublisher,
+    SimulatedDevice,
+)
+
+_LOGGER = logging.getLogger("dingz.benchmark")
+
+_MANIFEST = Path(__file__).parents[1] / "custom_components/dingz/manifest.json"
+_BASE_PORT = 18100
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "max": max(samples),
+    }
+
+
+class _Bench:
+    def __init__(
+        self,
+        count: int,
+        options: DeviceOptions,
+        *,
+        ram: RamModel | None = None,
+        max_concurrency: int | None = None,
+        publisher: RecordingPublisher | None = None,
+    ) -> None:
+        self.fleet = Fleet(
+            count, port=_BASE_PORT, options=options, ram=ram, publisher=publisher
+        )
+        self.limiter = api.RequestLimiter(8)
+        self.max_concurrency = max_concurrency
+        self.session: Any = None
+        self.clients: list[api.Client] = []
+
+    async def __aenter__(self) -> "_Bench":
+        await self.fleet.start()
+        self.session = api.create_session()
+        self.clients = [
+            api.Client(
+                self.session,
+                self.fleet.base_url(i),
+                limiter=self.limiter,
+                max_concurrency=self.max_concurrency,
+            )
+            for i in range(len(self.fleet.devices))
+        ]
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.session.close()
+        await self.fleet.stop()
+
+
+_RAM_MODELS = {
+    "default": RamModel(),
+    "roomy": RamModel(free=120000),
+}
+"""Devices with the simulator's default RAM and ones with room for parallel config reads."""
+
+
+async def _time_setup(
+    count: int,
+    options: DeviceOptions,
+    *,
+    ram: RamModel,
+    max_concurrency: int | None,
+) -> dict[str, Any]:
+    async with _Bench(
+        count, options, ram=ram, max_concurrency=max_concurrency
+    ) as bench:
+
+        async def setup(client: api.Client) -> None:
+            await client.get_state()
+            await client.get_full_device_config()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(setup(client) for client in bench.clients))
+        return {
+            "seconds": time.perf_counter() - start,
+            "errors": bench.fleet.stats()["errors"],
+            "max_concurrency": max(client.max_concurrency for client in bench.clients),
+        }
+
+
+async def bench_setup(count: int, options: DeviceOptions) -> list[dict[str, Any]]:
+    """Time until the config and state of all devices has been fetched, like during startup.
+
+    Serial config reads are compared to the default, which reads in parallel when the device has
+    the RAM for it.
+    """
+    return [
+        {
+            "devices": count,
+            "ram": name,
+            "serial": await _time_setup(count, options, ram=ram, max_concurrency=1),
+            "default": await _time_setup(count, options, ram=ram, max_concurrency=None),
+        }
+        for name, ram in _RAM_MODELS.items()
+    ]
+
+
+async def bench_polling(
+    count: int, options: DeviceOptions, *, rounds: int
+) -> dict[str, Any]:
+    """CPU time spent per state refresh."""
+    async with _Bench(count, options) as bench:
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(client.get_state() for client in bench.clients))
+        refreshes = rounds * count
+        return {
+            "devices": count,
+            "refreshes": refreshes,
+            "cpu_per_refresh": (time.process_time() - cpu_start) / refreshes,
+            "wall_per_round": (time.perf_counter() - wall_start) / rounds,
+        }
+
+
+async def bench_commands(options: DeviceOptions, *, samples: int) -> dict[str, Any]:
+    """Latency of a dimmer command until the new state has been read back."""
+    async with _Bench(1, options) as bench:
+        (client,) = bench.clients
+        latencies = []
+        for i in range(samples):
+            start = time.perf_counter()
+            await client.set_dimmer(0, "on", value=i % 100)
+            await client.get_state()
+            latencies.append(time.perf_counter() - start)
+        return _percentiles(latencies)
+
+
+_LOW_RAM = RamModel(free=50000)
+"""A device short enough on RAM for the client to back off its recovery gap, see `_AdaptiveGap`."""
+
+
+async def bench_commands_under_load(
+    options: DeviceOptions, *, samples: int
+) -> dict[str, Any]:
+    """Latency of a dimmer command while the config of the same device is fetched over and over.
+
+    A command should wait at most for the request already in flight and the initial recovery gap,
+    however far background requests backed off the gap. The bound is taken from commands sent to the
+    idle device.
+    """
+    async with _Bench(1, options, ram=_LOW_RAM) as bench:
+        (client,) = bench.clients
+        gap = client.throttle_gap
+
+        idle = []
+        for i in range(samples):
+            await asyncio.sleep(gap)
+            start = time.perf_counter()
+            await client.set_dimmer(0, "on", value=i % 100)
+            idle.append(time.perf_counter() - start)
+        request = statistics.median(idle)
+
+        async def load() -> None:
+            while True:
+                with contextlib.suppress(Exception):
+                    # every low RAM reading backs off the gap
+                    await client.get_ram()
+                    await client.get_full_device_config()
+
+        task = asyncio.create_task(load())
+        try:
+            loaded = []
+            gaps = []
+            for i in range(samples):
+                # leave the background requests some room, commands always go first
+                await asyncio.sleep(0.5)
+                gaps.append(client.throttle_gap)
+                start = time.perf_counter()
+                await client.set_dimmer(0, "on", value=i % 100)
+                loaded.append(time.perf_counter() - start)
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        bound = 2 * request + gap
+        return {
+            "idle": _percentiles(idle),
+            "loaded": _percentiles(loaded),
+            "gap": gap,
+            "backed_off_gap": _percentiles(gaps),
+            "bound": bound,
+            "within_bound": sum(latency <= bound for latency in loaded) / samples,
+        }
+
+
+_DEVICE_MODELS = {
+    "4 dimmers": DeviceOptions(dimmers=4, blinds=0),
+    "2 dimmers, 1 blind": DeviceOptions(dimmers=2, blinds=1),
+    "2 blinds": DeviceOptions(dimmers=0, blinds=2),
+    "ddi": DeviceOptions(dimmers=0, blinds=0, ddi_channels=8),
+}
+
+_MQTT_PAYLOADS = [
+    b'{"position":50,"goal":80,"lamella":100,"motion":1}',
+    b'{"turn":"on","brightness":50,"exception":0}',
+]
+
+
+def _json_backends() -> dict[str, Callable[[bytes], Any]]:
+    backends: dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+    try:
+        # what Home Assistant's json_loads uses
+        import orjson
+    except ImportError:
+        _LOGGER.warning("orjson isn't installed, only benchmarking the json module")
+    else:
+        backends["orjson"] = orjson.loads
+    return backends
+
+
+def _decode_cost(
+    loads: Callable[[bytes], Any], payloads: list[bytes], *, rounds: int
+) -> dict[str, float]:
+    cpu_start = time.process_time()
+    for _ in range(rounds):
+        for payload in payloads:
+            loads(payload)
+    cpu = time.process_time() - cpu_start
+
+    tracemalloc.start()
+    for payload in payloads:
+        loads(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    decodes = rounds * len(payloads)
+    return {"cpu_per_decode": cpu / decodes, "peak_bytes": peak}
+
+
+def bench_json_decode(*, devices: int, rounds: int) -> dict[str, Any]:
+    """Decoding of state responses of different device models and of MQTT payloads."""
+    results: dict[str, Any] = {}
+    for name, loads in _json_backends().items():
+        models = {}
+        for model, options in _DEVICE_MODELS.items():
+            payloads = [
+                json.dumps(
+                    SimulatedDevice(
+                        i,
+                        options=options,
+                        ram=RamModel(),
+                        publisher=RecordingPublisher(),
+                    ).state
+                ).encode()
+                for i in range(devices)
+            ]
+            models[model] = _decode_cost(loads, payloads, rounds=rounds)
+        results[name] = {
+            "state": models,
+            "mqtt": _decode_cost(loads, _MQTT_PAYLOADS, rounds=rounds * devices),
+        }
+    return results
+
+
+def _has_home_assistant() -> bool:
+    return importlib.util.find_spec("homeassistant") is not None
+
+
+async def _record_mqtt_trace() -> tuple[list[tuple[str, str]], dict[str, Any]]:
+    """Messages a simulated device pushes while it's operated, and its state afterwards.
+
+    The simulator doesn't generate input, button and PIR events, so one of each is added.
+    """
+    publisher = RecordingPublisher()
+    options = DeviceOptions(
+        latency=0.0, jitter=0.0, shade_travel_time=0.1, sensor_interval=0.2
+    )
+    async with _Bench(1, options, publisher=publisher) as bench:
+        (client,) = bench.clients
+        for index in range(options.dimmers):
+            await client.set_dimmer(index, "on", value=10 * (index + 1))
+        await client.move_blind_position(0, blind=50)
+        await client.move_blind(1, "down")
+        await asyncio.sleep(0.2)
+        device = bench.fleet.devices[0]
+        state = json.loads(json.dumps(device.state))
+
+    prefix = f"dingz/{device.dingz_id}/{device.dingz_id}"
+    trace = [
+        (topic, payload)
+        for topic, payload in publisher.messages
+        if not topic.endswith("/online")
+    ]
+    trace += [
+        (f"{prefix}/state/input/0", "1"),
+        (f"{prefix}/event/button/0", "p"),
+        (f"{prefix}/event/pir/0", "s"),
+        (f"{prefix}/event/pir/0", "n"),
+    ]
+    return trace, state
+
+
+async def bench_mqtt_dispatch(*, messages: int) -> dict[str, Any]:
+    """Decoding, state patching and dispatching of recorded push messages, without the MQTT client."""
+    from custom_components.dingz.shared import (
+        ButtonNotification,
+        InputStateNotification,
+        LightStateNotification,
+        MotorStateNotification,
+        PirNotification,
+        SimpleSensorStateNotification,
+        _decode_mqtt_message,
+        _Notifier,
+        _patch_state,
+    )
+
+    recorded, state = await _record_mqtt_trace()
+    notifier = _Notifier()
+    received = 0
+
+    def on_notification(notification: Any) -> None:
+        nonlocal received
+        received += 1
+
+    for notification_type in (
+        ButtonNotification,
+        InputStateNotification,
+        LightStateNotification,
+        MotorStateNotification,
+        PirNotification,
+    ):
+        for index in range(4):
+            notifier.add_listener(on_notification, (notification_type, index))
+    notifier.add_listener(on_notification, (SimpleSensorStateNotification, "light"))
+
+    trace = [recorded[i % len(recorded)] for i in range(messages)]
+    start = time.perf_counter()
+    for topic, payload in trace:
+        notification = _decode_mqtt_message(topic, payload)
+        assert notification is not None
+        # what Shared._dispatch_push does with every notification, apart from the push timeout
+        _patch_state(cast(api.State, state), notification)
+        notifier.dispatch(notification)
+    elapsed = time.perf_counter() - start
+    return {
+        "messages": messages,
+        "recorded": len(recorded),
+        "delivered": received,
+        "messages_per_second": messages / elapsed,
+    }
+
+
+_READS_PER_WRITE = 3
+"""Home Assistant reads `native_value` a couple of times for every state write."""
+
+
+def bench_path_lookup(*, updates: int) -> dict[str, Any]:
+    """Reading the sensor values from the state, walking the paths on every read vs once per update."""
+    from custom_components.dingz.sensor import _DYN_LIGHT_SENSOR, _STATE_SENSORS
+    from custom_components.dingz.shared import compile_json_path, json_path_lookup
+
+    state = SimulatedDevice(
+        0, options=DeviceOptions(), ram=RamModel(), publisher=RecordingPublisher()
+    ).state
+    descriptions = [desc for desc, _ in _STATE_SENSORS] + [_DYN_LIGHT_SENSOR]
+    paths = [compile_json_path(desc.key) for desc in descriptions]
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        for path in paths:
+            for _ in range(_READS_PER_WRITE):
+                json_path_lookup(state, path)
+    per_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        table = {path: json_path_lookup(state, path) for path in paths}
+        for path in paths:
+            for _ in range(_READS_PER_WRITE):
+                table[path]
+    per_update = time.perf_counter() - start
+
+    return {
+        "paths": len(paths),
+        "lookup_per_read": per_read / updates,
+        "resolved_per_update": per_update / updates,
+    }
+
+
+async def bench_memory(count: int, options: DeviceOptions) -> dict[str, Any]:
+    """Memory held per device for its client and the fetched data."""
+    async with _Bench(count, options) as bench:
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        clients = [
+            api.Client(bench.session, bench.fleet.base_url(i), limiter=bench.limiter)
+            for i in range(count)
+        ]
+        data = await asyncio.gather(
+            *(
+                asyncio.gather(client.get_state(), client.get_full_device_config())
+                for client in clients
+            )
+        )
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        return {"devices": count, "bytes_per_device": (after - before) / count}
+
+
+@contextlib.asynccontextmanager
+async def _home_assistant() -> AsyncIterator[Any]:
+    """A started Home Assistant instance with an empty configuration in a temporary directory."""
+    from homeassistant import bootstrap, runner
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        Path(config_dir, "configuration.yaml").write_text(
+            "homeassistant:\n  name: dingz benchmark\n"
+        )
+        hass = await bootstrap.async_setup_hass(
+            runner.RuntimeConfig(config_dir=config_dir, skip_pip=True)
+        )
+        assert hass is not None
+        await hass.async_start()
+        try:
+            yield hass
+        finally:
+            await hass.async_stop()
+
+
+async def _add_entries(hass: Any, fleet: Fleet) -> list[Any]:
+    """Add a config entry for every device of the fleet, returns once all of them are set up."""
+    from homeassistant import config_entries
+
+    from custom_components.dingz.const import DOMAIN
+
+    flows = [
+        await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_USER},
+            data={"host": fleet.base_url(i)},
+        )
+        for i in range(len(fleet.devices))
+    ]
+    # the confirm step creates the entry and waits for its setup
+    results = await asyncio.gather(
+        *(
+            hass.config_entries.flow.async_configure(flow["flow_id"], {})
+            for flow in flows
+        )
+    )
+    return [result["result"] for result in results]
+
+
+async def _remove_entries(hass: Any, entries: list[Any]) -> None:
+    for entry in entries:
+        await hass.config_entries.async_remove(entry.entry_id)
+
+
+async def _time_entry_setup(hass: Any, count: int, options: DeviceOptions) -> float:
+    fleet = Fleet(count, port=_BASE_PORT, options=options)
+    await fleet.start()
+    try:
+        start = time.perf_counter()
+        entries = await _add_entries(hass, fleet)
+        seconds = time.perf_counter() - start
+        await _remove_entries(hass, entries)
+    finally:
+        await fleet.stop()
+    return seconds
+
+
+async def _entity_command_latency(
+    hass: Any, options: DeviceOptions, *, samples: int
+) -> dict[str, Any]:
+    from homeassistant.core import callback
+    from homeassistant.helpers import device_registry as dr
+    from homeassistant.helpers import entity_registry as er
+    from homeassistant.helpers.event import async_track_state_change_event
+
+    from custom_components.dingz.const import DOMAIN
+    from custom_components.dingz.shared import COMMAND_SETTLE_TIME
+
+    fleet = Fleet(1, port=_BASE_PORT, options=options)
+    await fleet.start()
+    try:
+        (entry,) = await _add_entries(hass, fleet)
+        shared = hass.data[DOMAIN][entry.entry_id]
+        entity_id = er.async_get(hass).async_get_entity_id(
+            "light", DOMAIN, f"{dr.format_mac(fleet.devices[0].mac)}-dimmer-0"
+        )
+        assert entity_id is not None
+
+        state_written: list[float] = []
+        command_sent: list[float] = []
+        refreshed: list[float] = []
+        for i in range(samples):
+            expected = "on" if i % 2 == 0 else "off"
+            written = hass.loop.create_future()
+            refresh = hass.loop.create_future()
+
+            @callback
+            def on_state_changed(event: Any, written: Any = written) -> None:
+                new_state = event.data["new_state"]
+                if new_state is not None and new_state.state == expected:
+                    if not written.done():
+                        written.set_result(time.perf_counter())
+
+            @callback
+            def on_refresh(refresh: Any = refresh) -> None:
+                if not refresh.done():
+                    refresh.set_result(time.perf_counter())
+
+            unsub_state = async_track_state_change_event(
+                hass, [entity_id], on_state_changed
+            )
+            unsub_refresh = shared.state.async_add_listener(on_refresh)
+            try:
+                start = time.perf_counter()
+                await hass.services.async_call(
+                    "light", f"turn_{expected}", {"entity_id": entity_id}, blocking=True
+                )
+                command_sent.append(time.perf_counter() - start)
+                state_written.append(await asyncio.wait_for(written, 5.0) - start)
+                refreshed.append(
+                    await asyncio.wait_for(refresh, COMMAND_SETTLE_TIME + 5.0) - start
+                )
+            finally:
+                unsub_state()
+                unsub_refresh()
+
+        await _remove_entries(hass, [entry])
+    finally:
+        await fleet.stop()
+    return {
+        "state_written": _percentiles(state_written),
+        "command_sent": _percentiles(command_sent),
+        "refreshed": _percentiles(refreshed),
+    }
+
+
+async def _entry_memory(hass: Any, count: int, options: DeviceOptions) -> float:
+    fleet = Fleet(count, port=_BASE_PORT, options=options)
+    await fleet.start()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        entries = await _add_entries(hass, fleet)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await _remove_entries(hass, entries)
+    finally:
+        await fleet.stop()
+    return (after - before) / count
+
+
+async def bench_entries(
+    counts: list[int], options: DeviceOptions, *, samples: int
+) -> dict[str, Any]:
+    """Config entries set up by a running Home Assistant instance.
+
+    - setup time of all entries vs. device count
+    - command latency of a dimmer light: from the turn_on/turn_off service call until the state is
+      written, until the command has been sent and until the state has been refreshed afterwards
+    - memory per entry: its `Shared`, coordinators, entities and their states
+    """
+    async with _home_assistant() as hass:
+        setup = [
+            {"devices": count, "seconds": await _time_entry_setup(hass, count, options)}
+            for count in counts
+        ]
+        commands = await _entity_command_latency(hass, options, samples=samples)
+        memory = {
+            "devices": max(counts),
+            "bytes_per_entry": await _entry_memory(hass, max(counts), options),
+        }
+    return {"setup": setup, "commands": commands, "memory": memory}
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    options = DeviceOptions(latency=args.latency, jitter=args.jitter)
+    results: dict[str, Any] = {
+        "version": json.loads(_MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "latency": args.latency,
+        "setup": [],
+        "polling": [],
+    }
+    for count in args.devices:
+        _LOGGER.info("benchmarking %d devices", count)
+        results["setup"].extend(await bench_setup(count, options))
+        results["polling"].append(
+            await bench_polling(count, options, rounds=args.rounds)
+        )
+    results["commands"] = await bench_commands(options, samples=args.samples)
+    results["commands_under_load"] = await bench_commands_under_load(
+        options, samples=args.samples
+    )
+    results["memory"] = await bench_memory(max(args.devices), options)
+    results["json_decode"] = bench_json_decode(devices=100, rounds=args.rounds * 10)
+    if _has_home_assistant():
+        results["mqtt_dispatch"] = await bench_mqtt_dispatch(messages=args.messages)
+        results["path_lookup"] = bench_path_lookup(updates=args.messages)
+        results["entries"] = await bench_entries(
+            args.devices, options, samples=args.samples
+        )
+    else:
+        _LOGGER.warning(
+            "Home Assistant isn't installed, skipping the integration benchmarks"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = asyncio.run(_run(args))
+    encoded = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(encoded + "\n")
+    else:
+        sys.stdout.write(encoded + "\n")
+
+
+if __name__ == "__main__":
+    main()
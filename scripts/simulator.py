@@ -0,0 +1,514 @@
+"""Simulates dingz devices for load and latency testing.
+
+Every simulated device listens on its own port, starting at `--port`, and implements the parts of
+the REST API the integration uses. Responses are delayed by a configurable latency and every request
+in flight occupies some of the device's RAM. Once too little is left, the device answers with 500 like
+the real hardware does.
+
+MQTT messages are handed to a publisher. By default they're only logged; `RecordingPublisher` keeps
+them in memory so they can be fed to `Shared` in-process.
+
+    python scripts/simulator.py --devices 100 --port 8100 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import logging
+import random
+import time
+import urllib.parse
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("dingz.simulator")
+
+# Limits used by the integration to decide whether the device ran out of RAM.
+_MIN_FREE_RAM = 30000
+_MIN_LARGEST_FREE_BLOCK = 1500
+
+
+class MqttPublisher(Protocol):
+    def publish(self, topic: str, payload: str) -> None: ...
+
+
+class LoggingPublisher:
+    def publish(self, topic: str, payload: str) -> None:
+        _LOGGER.debug("mqtt %s: %s", topic, payload)
+
+
+@dataclasses.dataclass(slots=True)
+class RecordingPublisher:
+    """Keeps published messages in memory, optionally forwarding them to a callback."""
+
+    messages: list[tuple[str, str]] = dataclasses.field(default_factory=list)
+    on_publish: Callable[[str, str], None] | None = None
+
+    def publish(self, topic: str, payload: str) -> None:
+        self.messages.append((topic, payload))
+        if self.on_publish is not None:
+            self.on_publish(topic, payload)
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class RamModel:
+    """Free RAM of a device shrinks with every request in flight."""
+
+    free: int = 60000
+    largest_free_block: int = 12000
+    per_request: int = 8000
+    """RAM used by a single request in flight, config requests use twice as much."""
+    in_flight: int = 0
+
+    def snapshot(self) -> dict[str, int]:
+        free = max(0, self.free - self.in_flight * self.per_request)
+        return {
+            "free": free,
+            "largest_free_block": min(self.largest_free_block, free // 4),
+        }
+
+    def exhausted(self) -> bool:
+        ram = self.snapshot()
+        return (
+            ram["free"] < _MIN_FREE_RAM
+            or ram["largest_free_block"] < _MIN_LARGEST_FREE_BLOCK
+        )
+
+
+@dataclasses.dataclass(slots=True, kw_only=True)
+class DeviceOptions:
+    dimmers: int = 4
+    blinds: int = 2
+    ddi_channels: int = 0
+    latency: float = 0.05
+    jitter: float = 0.02
+    shade_travel_time: float = 5.0
+    sensor_interval: float = 10.0
+
+
+class SimulatedDevice:
+    def __init__(
+        self,
+        index: int,
+        *,
+        options: DeviceOptions,
+        ram: RamModel,
+        publisher: MqttPublisher,
+    ) -> None:
+        self.index = index
+        self.options = options
+        self.ram = ram
+        self.publisher = publisher
+        self.dingz_id = f"{0xA00000 + index:06X}"
+        self.mac = f"f0:08:d1:{index >> 16 & 0xFF:02x}:{index >> 8 & 0xFF:02x}:{index & 0xFF:02x}"
+        self.requests = 0
+        self.errors = 0
+        self._config_timestamp = int(time.time())
+        self._tasks: set[asyncio.Task[None]] = set()
+
+        self.state: dict[str, Any] = {
+            "dimmers": [
+                {"on": False, "output": 0, "ramp": 0, "readonly": False}
+                for _ in range(options.dimmers)
+            ],
+            "blinds": [
+                {"moving": "stop", "position": 100, "lamella": 100, "readonly": False}
+                for _ in range(options.blinds)
+            ],
+            "led": {"on": False, "hsv": "0;0;100", "rgb": "FFFFFF", "mode": "hsv"},
+            "sensors": {
+                "brightness": 120.0,
+                "room_temperature": 21.5,
+                "cpu_temperature": 45.0,
+                "puck_temperature": 30.0,
+                "fet_temperature": 28.0,
+                "input_state": False,
+                "pirs": [{"enabled": True, "motion": False}],
+                "power_outputs": [{"value": 0} for _ in range(options.dimmers)],
+            },
+            "thermostat": {"active": False},
+            "wifi": {"mac": self.mac, "ip": "127.0.0.1", "connected": True},
+            "config": {"timestamp": self._config_timestamp},
+            "ddi_channels": [
+                {"en": True, "on": False, "brightness": 0, "ct_enabled": False}
+                for _ in range(options.ddi_channels)
+            ],
+        }
+        self.system_config: dict[str, Any] = {
+            "id": self.dingz_id,
+            "dingz_name": f"Simulated dingz {index}",
+            "room_name": "Lab",
+        }
+        self.services_config: dict[str, Any] = {"mqtt": {"enable": False, "uri": ""}}
+
+    @property
+    def device(self) -> dict[str, Any]:
+        return {
+            "type": "dingz",
+            "fw_version": "2.1.0",
+            "hw_version": "1.3",
+            "puck_hw_model": "DZ1B-1CH",
+            "front_hw_model": "DZ1F-4B",
+            "has_pir": True,
+            "hash": f"{self._config_timestamp:x}",
+        }
+
+    def start(self) -> None:
+        self.publisher.publish(f"dingz/{self.dingz_id}/online", "true")
+        self._spawn(self._publish_sensors())
+
+    async def stop(self) -> None:
+        self.publisher.publish(f"dingz/{self.dingz_id}/online", "false")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/v1/state", self._get(lambda: self.state))
+        app.router.add_get("/api/v1/device", self._get(lambda: {self.mac: self.device}))
+        app.router.add_get(
+            "/api/v1/system_config", self._get(lambda: self.system_config)
+        )
+        app.router.add_get(
+            "/api/v1/services_config", self._get(lambda: self.services_config)
+        )
+        app.router.add_get(
+            "/api/v1/output_config",
+            self._get(lambda: {"outputs": self._outputs_config()}),
+        )
+        app.router.add_get("/api/v1/input_config", self._get(lambda: {"inputs": []}))
+        app.router.add_get("/api/v1/button_config", self._get(lambda: {"buttons": []}))
+        app.router.add_get(
+            "/api/v1/blind_config",
+            self._get(lambda: {"blinds": self._blinds_config()}),
+        )
+        app.router.add_get("/api/v1/ddi_channels_config", self._get_ddi_config)
+        app.router.add_get("/api/v1/ram", self._get(self.ram.snapshot))
+
+        app.router.add_post("/api/v1/dimmer/{index}/{action}", self._post_dimmer)
+        app.router.add_post(
+            "/api/v1/ddi/channels/{index}/brightness/{action}", self._post_ddi
+        )
+        app.router.add_post("/api/v1/shade/{index}/{action}", self._post_shade_action)
+        app.router.add_post("/api/v1/shade/{index}", self._post_shade_position)
+        app.router.add_post("/api/v1/led/set", self._post_led)
+        app.router.add_post("/api/v1/services_config", self._post_config)
+        app.router.add_post("/api/v1/system_config", self._post_config)
+        app.router.add_post("/api/v1/thermostat_config", self._post_config)
+        app.router.add_post("/api/v1/pir/{index}/reset_time", self._post_noop)
+        app.router.add_post("/api/v1/save_default_config", self._post_noop)
+        app.router.add_post("/api/v1/reboot", self._post_noop)
+        return app
+
+    @web.middleware
+    async def _middleware(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Any],
+    ) -> web.StreamResponse:
+        self.requests += 1
+        # the ram endpoint itself always works, that's how clients find out about the exhaustion
+        cost = 0
+        if not request.path.endswith("/ram"):
+            cost = 2 if request.path.endswith("_config") else 1
+        self.ram.in_flight += cost
+        try:
+            if cost and self.ram.exhausted():
+                self.errors += 1
+                raise web.HTTPInternalServerError(text="out of memory")
+            delay = self.options.latency + random.uniform(0, self.options.jitter)
+            await asyncio.sleep(delay)
+            return await handler(request)
+        finally:
+            self.ram.in_flight -= cost
+
+    def _get(self, data_fn: Callable[[], Any]) -> Callable[[web.Request], Any]:
+        async def handler(request: web.Request) -> web.Response:
+            return web.json_response(data_fn())
+
+        return handler
+
+    async def _get_ddi_config(self, request: web.Request) -> web.Response:
+        if not self.options.ddi_channels:
+            raise web.HTTPNotFound()
+        channels = [{"name": f"DDI {i + 1}"} for i in range(self.options.ddi_channels)]
+        return web.json_response({"ddi_channels": channels})
+
+    def _outputs_config(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "active": True,
+                "name": f"Light {i + 1}",
+                "type": "light",
+                "light": {"dimmable": True},
+            }
+            for i in range(self.options.dimmers)
+        ]
+
+    def _blinds_config(self) -> list[dict[str, Any]]:
+        return [
+            {"active": True, "name": f"Blind {i + 1}", "type": "shade"}
+            for i in range(self.options.blinds)
+        ]
+
+    def _item(self, key: str, request: web.Request) -> tuple[int, dict[str, Any]]:
+        index = int(request.match_info["index"])
+        try:
+            return index, self.state[key][index]
+        except IndexError:
+            raise web.HTTPNotFound() from None
+
+    async def _post_dimmer(self, request: web.Request) -> web.Response:
+        index, dimmer = self._item("dimmers", request)
+        action = request.match_info["action"]
+        value = request.query.get("value")
+        match action:
+            case "on":
+                dimmer["on"] = True
+            case "off":
+                dimmer["on"] = False
+            case "toggle":
+                dimmer["on"] = not dimmer["on"]
+            case "dim":
+                dimmer["on"] = True
+            case _:
+                raise web.HTTPBadRequest()
+        if value is not None:
+            dimmer["output"] = int(value)
+        elif dimmer["on"] and not dimmer["output"]:
+            dimmer["output"] = 100
+        self.state["sensors"]["power_outputs"][index]["value"] = (
+            dimmer["output"] if dimmer["on"] else 0
+        )
+
+        self.publisher.publish(
+            f"dingz/{self.dingz_id}/{self.dingz_id}/state/light/{index}",
+            json.dumps(
+                {
+                    "turn": "on" if dimmer["on"] else "off",
+                    "brightness": dimmer["output"],
+                    "exception": 0,
+                }
+            ),
+        )
+        return web.Response()
+
+    async def _post_ddi(self, request: web.Request) -> web.Response:
+        _, channel = self._item("ddi_channels", request)
+        action = request.match_info["action"]
+        if action == "toggle":
+            channel["on"] = not channel["on"]
+        else:
+            channel["on"] = action == "on"
+        if (value := request.query.get("value")) is not None:
+            channel["brightness"] = int(value)
+        if (ctvalue := request.query.get("ctvalue")) is not None:
+            channel["ct_enabled"] = True
+            channel["colour_temperature_k"] = int(ctvalue)
+        return web.Response()
+
+    async def _post_shade_action(self, request: web.Request) -> web.Response:
+        index, blind = self._item("blinds", request)
+        match request.match_info["action"]:
+            case "up":
+                self._move_blind(index, blind, position=100)
+            case "down":
+                self._move_blind(index, blind, position=0)
+            case "stop":
+                blind["moving"] = "stop"
+                self._publish_motor(index, blind)
+            case _:
+                pass
+        return web.Response()
+
+    async def _post_shade_position(self, request: web.Request) -> web.Response:
+        index, blind = self._item("blinds", request)
+        if (lamella := request.query.get("lamella")) is not None:
+            blind["lamella"] = int(lamella)
+        if (position := request.query.get("blind")) is not None:
+            self._move_blind(index, blind, position=int(position))
+        else:
+            self._publish_motor(index, blind)
+        return web.Response()
+
+    def _move_blind(self, index: int, blind: dict[str, Any], *, position: int) -> None:
+        if position == blind["position"]:
+            return
+        blind["moving"] = "up" if position > blind["position"] else "down"
+        self._publish_motor(index, blind)
+
+        async def travel() -> None:
+            distance = abs(position - blind["position"]) / 100
+            await asyncio.sleep(distance * self.options.shade_travel_time)
+            blind["position"] = position
+            blind["moving"] = "stop"
+            self._publish_motor(index, blind)
+
+        self._spawn(travel())
+
+    def _publish_motor(self, index: int, blind: dict[str, Any]) -> None:
+        motion = {"stop": 0, "up": 1, "down": 2}[blind["moving"]]
+        self.publisher.publish(
+            f"dingz/{self.dingz_id}/{self.dingz_id}/state/motor/{index}",
+            json.dumps(
+                {
+                    "position": blind["position"],
+                    "lamella": blind["lamella"],
+                    "motion": motion,
+                }
+            ),
+        )
+
+    async def _post_led(self, request: web.Request) -> web.Response:
+        # the body is form encoded, but without the matching content type
+        form = dict(urllib.parse.parse_qsl(await request.text()))
+        led = self.state["led"]
+        match form.get("action"):
+            case "on":
+                led["on"] = True
+            case "off":
+                led["on"] = False
+            case "toggle":
+                led["on"] = not led["on"]
+        if (color := form.get("color")) is not None:
+            led["hsv"] = color
+        return web.Response()
+
+    async def _post_config(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if request.path.endswith("services_config"):
+            for key, value in data.items():
+                self.services_config.setdefault(key, {}).update(value)
+        elif request.path.endswith("system_config"):
+            self.system_config.update(data)
+        self._config_timestamp += 1
+        self.state["config"]["timestamp"] = self._config_timestamp
+        return web.Response()
+
+    async def _post_noop(self, request: web.Request) -> web.Response:
+        return web.Response()
+
+    async def _publish_sensors(self) -> None:
+        sensors = self.state["sensors"]
+        while True:
+            await asyncio.sleep(self.options.sensor_interval)
+            sensors["brightness"] = max(0.0, sensors["brightness"] + random.gauss(0, 5))
+            self.publisher.publish(
+                f"dingz/{self.dingz_id}/{self.dingz_id}/sensor/light",
+                f"{sensors['brightness']:.1f}",
+            )
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class Fleet:
+    """A number of simulated devices listening on consecutive ports."""
+
+    def __init__(
+        self,
+        count: int,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8100,
+        options: DeviceOptions | None = None,
+        ram: RamModel | None = None,
+        publisher: MqttPublisher | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        publisher = publisher or LoggingPublisher()
+        options = options or DeviceOptions()
+        ram = ram or RamModel()
+        self.devices = [
+            SimulatedDevice(
+                i,
+                options=options,
+                ram=dataclasses.replace(ram),
+                publisher=publisher,
+            )
+            for i in range(count)
+        ]
+        self._runners: list[web.AppRunner] = []
+
+    def base_url(self, index: int) -> str:
+        return f"http://{self.host}:{self.port + index}"
+
+    async def start(self) -> None:
+        for i, device in enumerate(self.devices):
+            runner = web.AppRunner(device.create_app(), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, self.host, self.port + i).start()
+            self._runners.append(runner)
+            device.start()
+        _LOGGER.info(
+            "simulating %d devices on %s:%d-%d",
+            len(self.devices),
+            self.host,
+            self.port,
+            self.port + len(self.devices) - 1,
+        )
+
+    async def stop(self) -> None:
+        for device in self.devices:
+            await device.stop()
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": sum(device.requests for device in self.devices),
+            "errors": sum(device.errors for device in self.devices),
+        }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    fleet = Fleet(
+        args.devices,
+        host=args.host,
+        port=args.port,
+        options=DeviceOptions(
+            dimmers=args.dimmers,
+            blinds=args.blinds,
+            ddi_channels=args.ddi_channels,
+            latency=args.latency,
+            jitter=args.jitter,
+        ),
+    )
+    await fleet.start()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            _LOGGER.info("%s", fleet.stats())
+    finally:
+        await fleet.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--dimmers", type=int, default=4)
+    parser.add_argument("--blinds", type=int, default=2)
+    parser.add_argument("--ddi-channels", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()